@@ -0,0 +1,133 @@
+"""Tampons audio préalloués : fenêtres glissantes et transfert capture → analyse."""
+import threading
+
+import numpy as np
+
+
+class RingBuffer:
+    """Tampon circulaire de taille fixe contenant les derniers échantillons reçus"""
+
+    def __init__(self, capacity, dtype=np.float32):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=dtype)
+        # Position d'écriture et nombre total d'échantillons reçus
+        self.write_pos = 0
+        self.total_written = 0
+
+    def write(self, samples):
+        """Ajoute des échantillons en écrasant les plus anciens"""
+        n = len(samples)
+        if n >= self.capacity:
+            # Seule la fin du bloc tient dans le tampon
+            self.data[:] = samples[n - self.capacity:]
+            self.write_pos = 0
+        else:
+            first = min(n, self.capacity - self.write_pos)
+            self.data[self.write_pos:self.write_pos + first] = samples[:first]
+            self.data[:n - first] = samples[first:]
+            self.write_pos = (self.write_pos + n) % self.capacity
+        self.total_written += n
+
+    def latest(self, n, out=None):
+        """Copie les n derniers échantillons, du plus ancien au plus récent"""
+        if n > self.capacity:
+            raise ValueError(f"Impossible de lire {n} échantillons (capacité {self.capacity})")
+        if out is None:
+            out = np.empty(n, dtype=self.data.dtype)
+        start = self.write_pos - n
+        if start >= 0:
+            out[:] = self.data[start:self.write_pos]
+        else:
+            out[:-start] = self.data[start:]
+            out[-start:] = self.data[:self.write_pos]
+        return out
+
+
+class SlidingWindow:
+    """Fenêtre d'analyse longue avancée par petits pas (hop)
+
+    La taille de la fenêtre fixe la résolution fréquentielle, le pas fixe la
+    cadence des estimations : les deux réglages sont indépendants.
+    """
+
+    def __init__(self, window_size, hop_size):
+        if hop_size > window_size:
+            raise ValueError("Le pas d'analyse doit être inférieur à la taille de fenêtre")
+        self.window_size = window_size
+        self.hop_size = hop_size
+        self.ring = RingBuffer(window_size)
+        self.frame = np.zeros(window_size, dtype=np.float32)
+        self.pending = 0
+
+    def push(self, samples):
+        """Ajoute des échantillons ; renvoie le nombre de nouvelles trames prêtes"""
+        self.ring.write(samples)
+        self.pending += len(samples)
+        ready = self.pending // self.hop_size
+        self.pending -= ready * self.hop_size
+        return ready
+
+    def current_frame(self):
+        """Dernière fenêtre complète (vue réutilisée d'un appel à l'autre)"""
+        return self.ring.latest(self.window_size, out=self.frame)
+
+
+class FrameQueue:
+    """File à producteur unique / consommateur unique, sans verrou sur les données
+
+    Le producteur (callback PyAudio) n'écrit que ``head``, le consommateur
+    (thread d'analyse) n'écrit que ``tail`` : les blocs sont copiés dans des
+    emplacements préalloués et aucun des deux côtés n'attend l'autre. Si la
+    file est pleine, le bloc entrant est abandonné et compté.
+    """
+
+    def __init__(self, slots, block_size, dtype=np.float32):
+        self.slots = slots
+        self.block_size = block_size
+        self.blocks = np.zeros((slots, block_size), dtype=dtype)
+        self.lengths = np.zeros(slots, dtype=np.int64)
+        self.head = 0
+        self.tail = 0
+        # Compteurs de débordement (blocs et échantillons perdus)
+        self.overruns = 0
+        self.dropped_frames = 0
+        # Réveil du consommateur, seul point de synchronisation
+        self.data_ready = threading.Event()
+
+    def __len__(self):
+        return self.head - self.tail
+
+    def push(self, samples):
+        """Côté producteur : copie un bloc dans la file (jamais bloquant)"""
+        for start in range(0, len(samples), self.block_size):
+            block = samples[start:start + self.block_size]
+            if self.head - self.tail >= self.slots:
+                self.overruns += 1
+                self.dropped_frames += len(block)
+                continue
+            slot = self.head % self.slots
+            self.blocks[slot, :len(block)] = block
+            self.lengths[slot] = len(block)
+            self.head += 1
+        self.data_ready.set()
+
+    def pop(self, out, timeout=None):
+        """Côté consommateur : copie le plus ancien bloc dans out
+
+        Renvoie le nombre d'échantillons copiés, 0 si rien n'est arrivé avant
+        l'expiration du délai.
+        """
+        if self.head == self.tail:
+            if timeout is None:
+                return 0
+            self.data_ready.clear()
+            # Re-vérification après clear() pour ne pas manquer un push concurrent
+            if self.head == self.tail and not self.data_ready.wait(timeout):
+                return 0
+            if self.head == self.tail:
+                return 0
+        slot = self.tail % self.slots
+        n = int(self.lengths[slot])
+        out[:n] = self.blocks[slot, :n]
+        self.tail += 1
+        return n
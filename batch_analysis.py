@@ -0,0 +1,222 @@
+"""Analyse hors ligne de fichiers WAV (contrôle qualité des prises enregistrées).
+
+Les fichiers sont lus par blocs à travers un memmap (jamais chargés en entier),
+analysés avec le même moteur que l'accordeur en direct, et chaque trame
+produit une ligne pitch/note/cents en CSV ou en JSON lines. Les fichiers sont
+répartis sur un pool de processus.
+
+    python batch_analysis.py prises/*.wav --format jsonl --output-dir pistes/
+"""
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from audio_buffer import SlidingWindow
+from notes import frequency_to_note
+from pitch_detection import DETECTORS, create_detector
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+FIELDS = ['time', 'frequency', 'note', 'octave', 'cents', 'confidence', 'level']
+
+
+class WavReader:
+    """Lecture d'un fichier WAV par blocs via un memmap"""
+
+    def __init__(self, path):
+        self.path = path
+        fmt, self.data_offset, data_size = self._parse_chunks(path)
+        format_tag, self.channels, self.rate, bits = fmt
+        # PCM 24 bits : pas de dtype numpy, les octets sont assemblés par bloc
+        self.packed24 = format_tag == WAVE_FORMAT_PCM and bits == 24
+        if format_tag == WAVE_FORMAT_PCM and bits == 8:
+            dtype, self.scale, self.bias = np.uint8, 1 / 128, -128
+        elif format_tag == WAVE_FORMAT_PCM and bits in (16, 32):
+            dtype, self.scale, self.bias = np.dtype(f'<i{bits // 8}'), 1 / 2 ** (bits - 1), 0
+        elif self.packed24:
+            dtype, self.scale, self.bias = np.uint8, 1 / 2 ** 23, 0
+        elif format_tag == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+            dtype, self.scale, self.bias = np.dtype(f'<f{bits // 8}'), 1.0, 0
+        else:
+            raise ValueError(f"{path}: format WAV non supporté (tag {format_tag:#x}, {bits} bits)")
+        sample_bytes = 3 if self.packed24 else np.dtype(dtype).itemsize
+        self.frames = data_size // (sample_bytes * self.channels)
+        shape = (self.frames, self.channels, 3) if self.packed24 else (self.frames, self.channels)
+        self.data = np.memmap(path, dtype=dtype, mode='r', offset=self.data_offset, shape=shape)
+
+    @staticmethod
+    def _parse_chunks(path):
+        """Renvoie (format, position des données, taille des données)"""
+        fmt = None
+        with open(path, 'rb') as f:
+            riff, _, wave = struct.unpack('<4sI4s', f.read(12))
+            if riff != b'RIFF' or wave != b'WAVE':
+                raise ValueError(f"{path}: ce n'est pas un fichier WAV")
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise ValueError(f"{path}: bloc 'data' introuvable")
+                chunk_id, size = struct.unpack('<4sI', header)
+                if chunk_id == b'fmt ':
+                    body = f.read(size)
+                    format_tag, channels, rate, _, _, bits = struct.unpack('<HHIIHH', body[:16])
+                    if format_tag == WAVE_FORMAT_EXTENSIBLE:
+                        # Le vrai format est dans les deux premiers octets du sous-format
+                        format_tag = struct.unpack('<H', body[24:26])[0]
+                    fmt = (format_tag, channels, rate, bits)
+                elif chunk_id == b'data':
+                    if fmt is None:
+                        raise ValueError(f"{path}: bloc 'fmt ' manquant")
+                    # Fichiers tronqués : on se limite à ce qui est réellement présent
+                    offset = f.tell()
+                    size = min(size, os.path.getsize(path) - offset)
+                    return fmt, offset, size
+                else:
+                    f.seek(size, os.SEEK_CUR)
+                if size & 1:
+                    f.seek(1, os.SEEK_CUR)
+
+    @property
+    def duration(self):
+        return self.frames / self.rate
+
+    def blocks(self, block_size):
+        """Itère sur des blocs mono float32 de block_size échantillons"""
+        out = np.empty(block_size, dtype=np.float32)
+        if self.packed24:
+            samples = np.empty((block_size, self.channels), dtype=np.int32)
+        for start in range(0, self.frames, block_size):
+            block = self.data[start:start + block_size]
+            n = len(block)
+            if self.packed24:
+                # Octets de poids fort en tête, puis extension du signe
+                block, raw = samples[:n], block
+                block[:] = raw[..., 2]
+                block <<= 8
+                block |= raw[..., 1]
+                block <<= 8
+                block |= raw[..., 0]
+                block <<= 8
+                block >>= 8
+            # Mixage mono et normalisation dans [-1, 1]
+            if self.channels == 1:
+                out[:n] = block[:, 0]
+            else:
+                out[:n] = block.mean(axis=1)
+            if self.bias:
+                out[:n] += self.bias
+            if self.scale != 1.0:
+                out[:n] *= self.scale
+            yield out[:n]
+
+
+def analyse_file(path, detector='fft', window_size=8192, hop_size=512):
+    """Génère une ligne par trame analysée (dict avec les champs FIELDS)"""
+    return analyse_reader(WavReader(path), detector, window_size, hop_size)
+
+
+def analyse_reader(reader, detector='fft', window_size=8192, hop_size=512):
+    """Comme analyse_file, sur un WavReader déjà ouvert"""
+    pitch_detector = create_detector(detector, reader.rate, window_size)
+    window = SlidingWindow(window_size, hop_size)
+    for block in reader.blocks(hop_size):
+        if not window.push(block) or window.ring.total_written < window_size:
+            continue
+        estimate = pitch_detector.detect(window.current_frame())
+        note, octave, cents = frequency_to_note(estimate.frequency)
+        yield {
+            # Horodatage au centre de la fenêtre d'analyse
+            'time': round((window.ring.total_written - window_size / 2) / reader.rate, 4),
+            'frequency': round(estimate.frequency, 3),
+            'note': note,
+            'octave': octave,
+            'cents': round(cents, 2),
+            'confidence': round(estimate.confidence, 4),
+            'level': round(estimate.level, 6),
+        }
+
+
+def output_path(path, output_dir, fmt):
+    base = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir or os.path.dirname(path), f"{base}.pitch.{fmt}")
+
+
+def process_file(path, output_dir, fmt, detector, window_size, hop_size):
+    """Analyse un fichier et écrit sa piste ; renvoie (fichier, durée audio, trames)
+
+    Le WAV est décodé avant la création de la piste : un fichier illisible ne
+    laisse pas de piste vide derrière lui.
+    """
+    reader = WavReader(path)
+    rows = 0
+    destination = output_path(path, output_dir, fmt)
+    with open(destination, 'w', newline='') as out:
+        if fmt == 'csv':
+            writer = csv.DictWriter(out, fieldnames=FIELDS)
+            writer.writeheader()
+            write = writer.writerow
+        else:
+            def write(row):
+                out.write(json.dumps(row) + '\n')
+        for row in analyse_reader(reader, detector, window_size, hop_size):
+            write(row)
+            rows += 1
+    return path, reader.duration, rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse hors ligne de fichiers WAV")
+    parser.add_argument('files', nargs='+', help="fichiers WAV à analyser")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv',
+                        help="format de la piste de sortie")
+    parser.add_argument('--output-dir', help="dossier de sortie (par défaut : à côté du fichier)")
+    parser.add_argument('--detector', choices=sorted(DETECTORS), default='fft',
+                        help="algorithme de détection de hauteur")
+    parser.add_argument('--window', type=int, default=8192,
+                        help="taille de la fenêtre d'analyse en échantillons")
+    parser.add_argument('--hop', type=int, default=512,
+                        help="pas entre deux analyses en échantillons")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help="nombre de processus")
+    args = parser.parse_args(argv)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    audio_seconds = 0.0
+    done = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(process_file, path, args.output_dir, args.format,
+                               args.detector, args.window, args.hop)
+                   for path in args.files]
+        for future in as_completed(futures):
+            try:
+                path, duration, rows = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"Erreur: {e}", file=sys.stderr)
+                continue
+            done += 1
+            audio_seconds += duration
+            print(f"{path}: {rows} trames, {duration:.1f} s", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    print(f"{done} fichiers ({failed} en erreur), {audio_seconds:.1f} s d'audio en {elapsed:.2f} s : "
+          f"{done / elapsed:.2f} fichiers/s, {audio_seconds / elapsed:.1f} s d'audio/s",
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""Banc d'essai des détecteurs sur signaux synthétiques reproductibles.
+
+Pour chaque corde à vide (E2 à E4), on génère des pincements riches en
+harmoniques avec inharmonicité, des signaux sans fondamental, des
+désaccordages dans ±50 cents et du bruit. Chaque détecteur est mesuré en
+trames/s, en latence par trame (percentiles) et en erreur en cents.
+
+    python benchmark.py --save baseline.json
+    python benchmark.py --baseline baseline.json   # code de sortie 1 si régression
+
+``--memory`` fait passer les mêmes signaux, mis bout à bout, dans le pipeline
+(décimation, fenêtre glissante, porte d'énergie, détection) et mesure avec
+tracemalloc la mémoire retenue et les allocations de la pire trame, en mode
+standard et low_memory. Les seuils sont vérifiés par ``test_embedded.py``.
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from audio_buffer import SlidingWindow
+from decimation import Decimator, analysis_config
+from notes import STRINGS, note_frequency
+from pitch_detection import DETECTORS, EnergyGate, create_detector
+from tracking import PitchTracker
+
+RATE = 44100
+DURATION = 1.0
+DETUNES = (-50, -25, 0, 25, 50)
+VARIANTS = ('pluck', 'missing_fundamental', 'noisy')
+# Au-delà de cet écart (ou sans détection), l'estimation est une erreur grossière
+GROSS_ERROR_CENTS = 50.0
+
+
+def pluck(f0, rate=RATE, duration=DURATION, harmonics=12, inharmonicity=1e-4,
+          skip_fundamental=False, snr_db=None, rng=None):
+    """Corde pincée : harmoniques en 1/k, inharmoniques, à décroissance exponentielle"""
+    rng = rng or np.random.default_rng(0)
+    t = np.arange(int(rate * duration)) / rate
+    signal = np.zeros_like(t)
+    for k in range(2 if skip_fundamental else 1, harmonics + 1):
+        fk = k * f0 * np.sqrt(1 + inharmonicity * k * k)
+        if fk >= rate / 2:
+            break
+        # Les harmoniques aiguës s'éteignent plus vite
+        decay = np.exp(-t * (1.5 + 0.5 * k))
+        signal += decay * np.sin(2 * np.pi * fk * t + rng.uniform(0, 2 * np.pi)) / k
+    signal *= 0.5 / np.max(np.abs(signal))
+    if snr_db is not None:
+        noise_rms = np.sqrt(np.mean(signal ** 2)) / 10 ** (snr_db / 20)
+        signal += rng.normal(0, noise_rms, len(signal))
+    return signal.astype(np.float32)
+
+
+def test_signals(seed=0):
+    """Génère (corde, variante, désaccordage, fréquence attendue, signal)"""
+    rng = np.random.default_rng(seed)
+    for string, _ in STRINGS:
+        for variant in VARIANTS:
+            for detune in DETUNES:
+                f0 = note_frequency(string) * 2 ** (detune / 1200)
+                signal = pluck(f0, skip_fundamental=variant == 'missing_fundamental',
+                               snr_db=10 if variant == 'noisy' else None, rng=rng)
+                yield string, variant, detune, f0, signal
+
+
+def run_detector(name, signals, window_size, hop_size):
+    """Mesure un détecteur sur tous les signaux ; renvoie un dict de résultats"""
+    detector = create_detector(name, RATE, window_size)
+    latencies = []
+    errors = []
+    for _, _, _, f0, signal in signals:
+        for start in range(0, len(signal) - window_size + 1, hop_size):
+            frame = signal[start:start + window_size]
+            t0 = time.perf_counter_ns()
+            estimate = detector.detect(frame)
+            latencies.append(time.perf_counter_ns() - t0)
+            if estimate.frequency > 0:
+                errors.append(1200 * np.log2(estimate.frequency / f0))
+            else:
+                errors.append(np.inf)
+    latencies = np.array(latencies) / 1000.0
+    errors = np.abs(np.array(errors))
+    detected = errors[np.isfinite(errors)]
+    good = errors[errors <= GROSS_ERROR_CENTS]
+    return {
+        'frames': len(latencies),
+        'frames_per_sec': round(len(latencies) / (latencies.sum() / 1e6), 1),
+        'latency_us': {f'p{p}': round(float(np.percentile(latencies, p)), 1) for p in (50, 90, 99)},
+        'detection_rate': round(len(detected) / len(errors), 4),
+        'gross_error_rate': round(1 - len(good) / len(errors), 4),
+        'median_abs_cents': round(float(np.median(good)), 3) if len(good) else None,
+        'p90_abs_cents': round(float(np.percentile(good, 90)), 3) if len(good) else None,
+    }
+
+
+def memory_check(name, signals, window_size, hop_size, low_memory=True, block_size=512,
+                 track=False):
+    """Mémoire retenue et allocations de la trame la plus coûteuse sur un long passage
+
+    Pipeline : décimation, fenêtre glissante, porte d'énergie et détecteur.
+    Avec track, c'est le chemin de l'accordeur : trames analysées seulement
+    porte ouverte, par le suivi (recherche complète à l'attaque, bancs étroits).
+    """
+    factor, rate, window_size, hop_size = analysis_config(RATE, window_size, hop_size)
+    decimator = Decimator(factor)
+    window = SlidingWindow(window_size, hop_size)
+    gate = EnergyGate(RATE)
+    detector = create_detector(name, rate, window_size, low_memory=low_memory)
+    tracker = PitchTracker(rate, window_size, detector, low_memory=low_memory) if track else None
+    signal = np.concatenate([signal for *_, signal in signals])
+    blocks = [signal[start:start + block_size]
+              for start in range(0, len(signal) - block_size + 1, block_size)]
+
+    def run(measure):
+        frames = worst = 0
+        for block in blocks:
+            if measure:
+                base = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            onset = gate.update(block) and gate.onset
+            if window.push(decimator.process(block)):
+                if tracker is None:
+                    detector.detect(window.current_frame())
+                elif gate.active:
+                    tracker.update(window.current_frame(), onset)
+                else:
+                    tracker.reset()
+                frames += 1
+            if measure:
+                worst = max(worst, tracemalloc.get_traced_memory()[1] - base)
+        return frames, worst
+
+    # Premier passage (déjà tracé, pour que les libérations du second soient
+    # vues) : tampons agrandis et caches remplis
+    tracemalloc.start()
+    run(measure=False)
+    gc.collect()
+    collections = sum(generation['collections'] for generation in gc.get_stats())
+    before = tracemalloc.get_traced_memory()[0]
+    frames, worst = run(measure=True)
+    gc.collect()
+    growth = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return {
+        'frames': frames,
+        'growth_bytes': growth,
+        'growth_per_frame': round(growth / frames, 3) if frames else 0.0,
+        'max_frame_bytes': worst,
+        'gc_collections': sum(generation['collections'] for generation in gc.get_stats())
+                          - collections - 1,
+    }
+
+
+def compare(results, baseline, max_slowdown, max_cents_increase, max_gross_increase):
+    """Liste des régressions par rapport à une exécution de référence"""
+    failures = []
+    for name, result in results.items():
+        ref = baseline.get('detectors', {}).get(name)
+        if ref is None:
+            continue
+        if result['frames_per_sec'] < ref['frames_per_sec'] * (1 - max_slowdown):
+            failures.append(f"{name}: {result['frames_per_sec']} trames/s "
+                            f"(référence {ref['frames_per_sec']})")
+        if result['gross_error_rate'] > ref['gross_error_rate'] + max_gross_increase:
+            failures.append(f"{name}: taux d'erreurs grossières {result['gross_error_rate']} "
+                            f"(référence {ref['gross_error_rate']})")
+        if (ref['median_abs_cents'] is not None and result['median_abs_cents'] is not None
+                and result['median_abs_cents'] > ref['median_abs_cents'] + max_cents_increase):
+            failures.append(f"{name}: erreur médiane {result['median_abs_cents']} cents "
+                            f"(référence {ref['median_abs_cents']})")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des détecteurs de hauteur")
+    parser.add_argument('--detectors', nargs='+', choices=sorted(DETECTORS), default=sorted(DETECTORS))
+    parser.add_argument('--window', type=int, default=8192)
+    parser.add_argument('--hop', type=int, default=2048)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help="enregistre les résultats (JSON)")
+    parser.add_argument('--baseline', help="résultats de référence à ne pas dégrader")
+    parser.add_argument('--max-slowdown', type=float, default=0.25,
+                        help="baisse de trames/s tolérée (fraction)")
+    parser.add_argument('--max-cents-increase', type=float, default=0.5,
+                        help="hausse tolérée de l'erreur médiane (cents)")
+    parser.add_argument('--max-gross-increase', type=float, default=0.02,
+                        help="hausse tolérée du taux d'erreurs grossières")
+    parser.add_argument('--memory', action='store_true',
+                        help="mesure la mémoire retenue et allouée par trame (tracemalloc)")
+    args = parser.parse_args(argv)
+
+    signals = list(test_signals(args.seed))
+    if args.memory:
+        return memory_main(args, signals)
+    results = {}
+    print(f"{'détecteur':<10}{'trames/s':>10}{'p50 µs':>9}{'p99 µs':>9}"
+          f"{'détection':>11}{'grossières':>12}{'méd. cents':>12}")
+    for name in args.detectors:
+        result = results[name] = run_detector(name, signals, args.window, args.hop)
+        median = result['median_abs_cents']
+        print(f"{name:<10}{result['frames_per_sec']:>10.0f}{result['latency_us']['p50']:>9.0f}"
+              f"{result['latency_us']['p99']:>9.0f}{result['detection_rate']:>11.1%}"
+              f"{result['gross_error_rate']:>12.1%}{'--' if median is None else f'{median:.2f}':>12}")
+
+    report = {
+        'config': {'rate': RATE, 'window': args.window, 'hop': args.hop, 'seed': args.seed},
+        'detectors': results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('config') != report['config']:
+            print("Attention : configuration différente de la référence", file=sys.stderr)
+        failures = compare(results, baseline, args.max_slowdown,
+                           args.max_cents_increase, args.max_gross_increase)
+        for failure in failures:
+            print(f"RÉGRESSION {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+def memory_main(args, signals):
+    """Rapport de --memory (les seuils sont vérifiés par test_embedded.py)"""
+    print(f"{'détecteur':<10}{'mode':>18}{'trames':>8}{'octets/trame':>14}"
+          f"{'pire trame':>12}{'GC':>6}")
+    for name in args.detectors:
+        for low_memory, track in ((False, False), (True, False), (False, True), (True, True)):
+            result = memory_check(name, signals, args.window, args.hop, low_memory=low_memory,
+                                  track=track)
+            mode = ('low_memory' if low_memory else 'standard') + ('+suivi' if track else '')
+            print(f"{name:<10}{mode:>18}{result['frames']:>8}{result['growth_per_frame']:>14.2f}"
+                  f"{result['max_frame_bytes']:>12}{result['gc_collections']:>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
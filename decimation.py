@@ -0,0 +1,78 @@
+"""Décimation de l'entrée vers une fréquence d'analyse adaptée à la guitare.
+
+Les fondamentaux d'une guitare restent sous ~1.3 kHz : analyser à 44.1 kHz
+gaspille l'essentiel de chaque FFT. L'entrée est filtrée (FIR passe-bas
+conçu par scipy.signal.firwin) puis sous-échantillonnée d'un facteur entier
+vers ~11 kHz. Le filtre garde son état d'un bloc à l'autre et seuls les
+échantillons conservés sont calculés (équivalent d'un filtre polyphase), dans
+des tampons alloués une fois (agrandis seulement si un bloc plus long arrive).
+
+Les tailles de fenêtre et de pas sont données pour 44.1 kHz : elles sont
+converties pour garder la même durée, donc la même résolution en Hz.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.fft import next_fast_len
+from scipy.signal import firwin
+
+# Fréquence d'analyse visée et fréquence de référence des tailles de fenêtre
+ANALYSIS_RATE = 11025
+REFERENCE_RATE = 44100
+
+
+def analysis_config(input_rate, window_size, hop_size, analysis_rate=ANALYSIS_RATE):
+    """(facteur, fréquence d'analyse, fenêtre, pas) pour une fréquence d'entrée"""
+    factor = max(1, int(input_rate // analysis_rate)) if analysis_rate else 1
+    rate = input_rate / factor
+    scale = rate / REFERENCE_RATE
+    window = next_fast_len(int(round(window_size * scale)), real=True)
+    hop = max(1, min(window, int(round(hop_size * scale))))
+    return factor, rate, window, hop
+
+
+class Decimator:
+    """Filtre anti-repliement + sous-échantillonnage d'un facteur entier, avec état"""
+
+    def __init__(self, factor, numtaps=None):
+        self.factor = factor
+        self.phase = 0
+        if factor > 1:
+            # Coupure à 90 % de la nouvelle fréquence de Nyquist
+            numtaps = numtaps or 16 * factor + 1
+            self.taps = firwin(numtaps, 0.9 / factor).astype(np.float32)[::-1].copy()
+            self.history = np.zeros(numtaps - 1, dtype=np.float32)
+            self.reserve(2048)
+
+    def reserve(self, block_size):
+        """Tampons pour des blocs jusqu'à block_size échantillons"""
+        self.buffer = np.zeros(len(self.history) + block_size, dtype=np.float32)
+        self.output = np.zeros(block_size // self.factor + 1, dtype=np.float32)
+        # Ligne i : les numtaps entrées qui précèdent l'échantillon i du bloc (vue)
+        self.windows = sliding_window_view(self.buffer, len(self.taps))
+
+    @property
+    def delay(self):
+        """Retard du filtre en échantillons d'entrée (phase linéaire)"""
+        return (len(self.taps) - 1) / 2 if self.factor > 1 else 0.0
+
+    def process(self, block):
+        """Renvoie les échantillons décimés du bloc (le reste est gardé pour le suivant)
+
+        Le résultat est une vue sur un tampon réutilisé : à consommer avant
+        l'appel suivant.
+        """
+        if self.factor == 1:
+            return block
+        n = len(block)
+        kept = len(self.history)
+        if kept + n > len(self.buffer):
+            self.reserve(n)
+        buffer = self.buffer
+        buffer[:kept] = self.history
+        buffer[kept:kept + n] = block
+        # Une ligne par échantillon conservé
+        windows = self.windows[self.phase:n:self.factor]
+        out = np.matmul(windows, self.taps, out=self.output[:len(windows)])
+        self.history[:] = buffer[n:kept + n]
+        self.phase = (self.phase - n) % self.factor
+        return out
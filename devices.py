@@ -0,0 +1,195 @@
+"""Détection des périphériques d'entrée audio avec cache persistant.
+
+Ouvrir un flux de test sur chaque périphérique est lent : le résultat est
+mémorisé dans un fichier JSON indexé par nom de périphérique, API hôte et
+paramètres demandés (format, canaux, fréquence, taille de bloc). Au démarrage,
+la liste en cache est utilisée immédiatement et la revalidation se fait en
+arrière-plan.
+
+Avec rate='auto', chaque périphérique est négocié : la fréquence (au moins
+celle de l'analyse) et le bloc qui donnent la plus faible latence d'entrée. Le
+résultat (fréquence, bloc, latence d'entrée annoncée) est mémorisé dans la
+même entrée de cache que le test.
+"""
+import json
+import os
+import threading
+
+# Mots-clés identifiant les périphériques Bluetooth (ignorés)
+BLUETOOTH_KEYWORDS = ['bluetooth', 'bt', 'wireless']
+
+# Candidats de la négociation, du plus économe au plus coûteux
+CANDIDATE_RATES = (11025, 16000, 22050, 32000, 44100, 48000)
+CANDIDATE_CHUNKS = (128, 256, 512, 1024, 2048)
+
+
+def cache_path():
+    """Emplacement du cache (respecte XDG_CACHE_HOME)"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'guitar_tuner', 'devices.json')
+
+
+class DeviceCache:
+    """Résultats de test des périphériques, persistés entre les lancements"""
+
+    def __init__(self, path=None):
+        self.path = path or cache_path()
+        self.entries = {}
+        self.lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, key):
+        with self.lock:
+            return self.entries.get(key)
+
+    def set(self, key, **result):
+        with self.lock:
+            self.entries[key] = result
+
+    def save(self):
+        # Verrou tenu jusqu'au remplacement : deux threads n'écrivent jamais le
+        # fichier temporaire en même temps
+        with self.lock:
+            data = json.dumps(self.entries, indent=1)
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                # Écriture atomique pour ne jamais laisser un cache tronqué
+                tmp = self.path + '.tmp'
+                with open(tmp, 'w') as f:
+                    f.write(data)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"Impossible d'écrire le cache des périphériques: {e}")
+
+
+def device_key(name, host_api, fmt, channels, rate, chunk):
+    return f"{host_api}|{name}|{fmt}|{channels}|{rate}|{chunk}"
+
+
+def enumerate_inputs(p):
+    """Liste les entrées (nom, index, API hôte) sans ouvrir de flux"""
+    inputs = []
+    for i in range(p.get_device_count()):
+        try:
+            device_info = p.get_device_info_by_index(i)
+            if device_info['maxInputChannels'] <= 0:
+                continue
+            name = device_info['name']
+            # Skip Bluetooth devices
+            if any(keyword in name.lower() for keyword in BLUETOOTH_KEYWORDS):
+                print(f"Skipping Bluetooth device: {name}")
+                continue
+            host_api = p.get_host_api_info_by_index(device_info['hostApi'])['name']
+            inputs.append((name, i, host_api))
+        except Exception as e:
+            print(f"Error getting device info for index {i}: {str(e)}")
+    return inputs
+
+
+def probe_device(p, index, fmt, channels, rate, chunk, with_latency=False):
+    """Vérifie qu'un flux peut être ouvert ; renvoie (compatible, erreur)
+
+    Avec with_latency, renvoie (compatible, erreur, latence d'entrée en s).
+    """
+    latency = None
+    try:
+        test_stream = p.open(
+            format=fmt,
+            channels=channels,
+            rate=rate,
+            input=True,
+            input_device_index=index,
+            frames_per_buffer=chunk,
+            start=False  # Don't start the stream, just test if it can be opened
+        )
+        latency = test_stream.get_input_latency()
+        test_stream.close()
+        result = True, None
+    except Exception as e:
+        result = False, str(e)
+    return result + (latency,) if with_latency else result
+
+
+def negotiate_device(p, index, fmt, channels, min_rate=11025):
+    """Fréquence (>= min_rate) et bloc donnant la plus faible latence d'entrée
+
+    Pour chaque fréquence acceptée, on garde le plus petit bloc qui s'ouvre ;
+    la latence retenue est celle annoncée par PortAudio plus la durée d'un
+    bloc (à latence égale, la fréquence la plus basse l'emporte). Renvoie un
+    dict (compatible, error, rate, chunk, latency) à mettre en cache.
+    """
+    info = p.get_device_info_by_index(index)
+    rates = {rate for rate in CANDIDATE_RATES if rate >= min_rate}
+    rates.add(int(info['defaultSampleRate']))
+    error = "aucune fréquence d'échantillonnage acceptée"
+    best = None
+    for rate in sorted(rates):
+        try:
+            p.is_format_supported(rate, input_device=index, input_channels=channels,
+                                  input_format=fmt)
+        except ValueError as e:
+            error = str(e)
+            continue
+        for chunk in CANDIDATE_CHUNKS:
+            compatible, error, latency = probe_device(p, index, fmt, channels, rate, chunk,
+                                                      with_latency=True)
+            if compatible:
+                total = latency + chunk / rate
+                if best is None or total < best[0]:
+                    best = total, dict(compatible=True, error=None, rate=rate, chunk=chunk,
+                                       latency=latency)
+                break
+    return best[1] if best else dict(compatible=False, error=error)
+
+
+def negotiated_format(p, cache, index, fmt, channels):
+    """Format négocié d'un périphérique d'après le cache, None s'il ne l'est pas encore
+
+    La négociation elle-même (lente) n'est faite que par probe_devices, dans
+    le thread de test.
+    """
+    info = p.get_device_info_by_index(index)
+    host_api = p.get_host_api_info_by_index(info['hostApi'])['name']
+    entry = cache.get(device_key(info['name'], host_api, fmt, channels, 'auto', 'auto'))
+    return entry if entry and entry.get('compatible') else None
+
+
+def cached_devices(p, cache, fmt, channels, rate, chunk):
+    """Périphériques compatibles d'après le cache, sans aucun test"""
+    return [(name, index) for name, index, host_api in enumerate_inputs(p)
+            if (cache.get(device_key(name, host_api, fmt, channels, rate, chunk)) or {}).get('compatible')]
+
+
+def probe_devices(p, cache, fmt, channels, rate, chunk, skip=(), min_rate=11025):
+    """Teste chaque entrée, met à jour le cache et renvoie les compatibles
+
+    Les index listés dans ``skip`` (périphérique en cours d'utilisation) ne
+    sont pas rouverts : le résultat en cache est conservé. Avec rate='auto',
+    le format de chaque entrée est négocié (voir negotiate_device).
+    """
+    devices = []
+    for name, index, host_api in enumerate_inputs(p):
+        key = device_key(name, host_api, fmt, channels, rate, chunk)
+        if index in skip and (cache.get(key) or {}).get('compatible'):
+            devices.append((name, index))
+            continue
+        if rate == 'auto':
+            entry = negotiate_device(p, index, fmt, channels, min_rate)
+            cache.set(key, **entry)
+            compatible, error = entry['compatible'], entry['error']
+        else:
+            compatible, error = probe_device(p, index, fmt, channels, rate, chunk)
+            cache.set(key, compatible=compatible, error=error)
+        if compatible:
+            devices.append((name, index))
+            print(f"Added USB device: {name}")
+        else:
+            print(f"Device {name} is not compatible: {error}")
+    cache.save()
+    if not devices:
+        print("No compatible USB audio devices found")
+    return devices
@@ -2,14 +2,26 @@ import tkinter as tk
 from tkinter import ttk
 import pyaudio
 import numpy as np
-from scipy.fft import fft
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import gc
 import threading
 import time
 import sys
 import math
-import os
+import argparse
+
+from pitch_detection import (DETECTORS, EnergyGate, PolyphonicDetector, TargetedDetector,
+                             create_detector)
+from audio_buffer import FrameQueue, SlidingWindow
+from notes import A4_FREQ, NOTES, TUNINGS, NoteTable
+from instrumentation import NULL_STATS, CpuMeter, GcTimer, Stats, StatsDumper, format_overlay
+from devices import DeviceCache, cached_devices, negotiated_format, probe_devices
+from decimation import ANALYSIS_RATE, Decimator, analysis_config
+import pipeline
+from pitch_server import PitchServer
+from recording import Recorder, ReplaySource
+from tracking import PitchTracker
+from spectrum_view import SpectrumView
+from shared_capture import SharedCapture
 
 # Modern color scheme
 COLORS = {
@@ -29,7 +41,12 @@ COLORS = {
 }
 
 class GuitarTuner:
-    def __init__(self, root):
+    def __init__(self, root, detector='fft', window_size=8192, hop_size=512,
+                 capture_mode='callback', fps=30, stats=False, stats_dump=None,
+                 stats_interval=1.0, poly=False, server=None, tuning='Standard', gate=True,
+                 targeted=False, track=True, spectrum=False, record=None, record_seconds=60.0,
+                 replay=None, replay_speed=1.0, process=False, rate='auto',
+                 analysis_rate=ANALYSIS_RATE, embedded=False):
         self.root = root
         self.root.title("Guitar Tuner")
         # Set fixed window size and background
@@ -68,6 +85,14 @@ class GuitarTuner:
                            background=COLORS['background'],
                            foreground=COLORS['text'],
                            font=('Arial', 10))
+        self.style.configure('TCheckbutton',
+                           background=COLORS['background'],
+                           foreground=COLORS['text'],
+                           font=('Arial', 10))
+        self.style.map('TCheckbutton',
+                      background=[('active', COLORS['background'])],
+                      foreground=[('active', COLORS['accent'])])
+        
         self.style.map('TRadiobutton',
                       background=[('active', COLORS['background'])],
                       foreground=[('active', COLORS['accent'])])
@@ -104,71 +129,261 @@ class GuitarTuner:
         self.root.option_add('*TCombobox*font', ('Arial', 9))
         
         # Configuration audio
-        self.CHUNK = 2048
+        # Fenêtre d'analyse longue (résolution) avancée par petits pas (cadence) ;
+        # tailles données à 44.1 kHz, converties à la fréquence d'analyse
+        self.WINDOW_SIZE = window_size
+        self.HOP_SIZE = hop_size
+        self.CHUNK = self.HOP_SIZE
         self.FORMAT = pyaudio.paFloat32
         self.CHANNELS = 1
-        self.RATE = 44100
+        # Relecture d'un enregistrement à la place du périphérique (voir recording.py)
+        self.replay = ReplaySource(replay, speed=replay_speed) if replay else None
+        # Fréquence d'entrée : lue dans l'enregistrement, imposée, ou négociée par
+        # périphérique ('auto') ; l'analyse se fait après décimation vers analysis_rate
+        self.requested_rate = self.replay.rate if self.replay else rate
+        self.RATE = 44100 if self.requested_rate == 'auto' else self.requested_rate
+        self.analysis_rate = analysis_rate
+        # Latence d'entrée annoncée par PortAudio et latence entrée → affichage mesurée
+        self.input_latency = 0.0
+        self.block_time = 0.0
+        self.estimate_time = 0.0
+        self.display_latency = 0.0
+        self.analysis_lock = threading.Lock()
         self.p = pyaudio.PyAudio()
         self.stream = None
         self.current_device = None
+        # Résultats de test des périphériques, revalidés en arrière-plan
+        self.device_cache = DeviceCache()
+        self.probing = False
+        
+        # Mode de capture : 'callback' (PyAudio pousse les blocs dans une file
+        # préallouée) ou 'blocking' (le thread d'analyse lit lui-même le flux)
+        self.capture_mode = 'blocking' if self.replay else capture_mode
+        # Capture et détection dans un processus enfant (voir shared_capture.py) ;
+        # self.stream est alors un SharedCapture dont on lit les résultats au rendu
+        self.process_mode = process and not self.replay
+        self.detector_name = detector
+        self.track = track
+        # Mode embarqué : détecteurs sans allocation par trame (low_memory) et
+        # objets de démarrage soustraits au ramasse-miettes (gc.freeze)
+        self.embedded = embedded
+        self.use_gate = gate
+        self.capture_seq = 0
+        self.frame_queue = FrameQueue(64, self.CHUNK)
+        self.capture_block = np.zeros(self.CHUNK, dtype=np.float32)
+        # Débordements signalés par PortAudio en mode callback
+        self.input_overflows = 0
         
         # Configuration de détection des notes
-        self.NOTES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-        self.A4_FREQ = 440.0
+        self.NOTES = NOTES
+        self.A4_FREQ = A4_FREQ
+        
+        # Instrumentation du chemin critique (sans coût lorsqu'elle est désactivée)
+        self.stats = Stats() if stats or stats_dump else NULL_STATS
+        
+        # Table de conversion des notes (référence, décalage et accordage)
+        self.note_table = NoteTable(self.A4_FREQ, 0, tuning)
+        
+        # Mode accord : les six cordes sont estimées sur la même trame (pas dans
+        # le processus enfant, qui n'exécute que le détecteur général ou ciblé)
+        self.poly_mode = poly and not self.process_mode
+        self.poly_targets = list(self.note_table.string_frequencies)
+        self.last_poly = []
+        # Mode zoom : analyse fine autour de la corde sélectionnée, le détecteur
+        # général prenant le relais quand la note jouée sort de la bande
+        self.targeted_mode = targeted
+        # Attaque détectée depuis la dernière analyse (plusieurs blocs par lecture)
+        self.onset_pending = False
+        self.spectrum_view = None
+        
+        # Décimateur, fenêtre glissante et détecteurs pour la fréquence d'entrée
+        self.configure_analysis()
+        
+        # Enregistrement optionnel des blocs bruts reçus (fichier anneau borné)
+        self.recorder = None
+        self.record_seconds = record_seconds
+        if record and self.process_mode:
+            # Les blocs bruts ne quittent pas le processus enfant
+            print("Enregistrement indisponible avec la capture dans un processus séparé")
+        elif record:
+            self.recorder = Recorder(record, self.RATE, self.CHUNK, max_seconds=record_seconds)
+        
+        # Porte d'énergie : pas d'analyse spectrale pendant les silences
+        self.gate = EnergyGate(self.RATE) if gate else None
+        # Charge CPU du thread d'analyse, porte fermée ('idle') ou ouverte ('active')
+        self.cpu_meter = None
+        if self.stats.enabled:
+            self.cpu_meter = self.stats.cpu_meter = CpuMeter()
         
         # Décalage d'accordage en demi-tons
         self.semitone_offset = 0
         
+        # Dernière estimation publiée par le thread d'analyse. Le rendu tourne à
+        # cadence fixe et ne lit que la plus récente (les intermédiaires sont ignorées)
+        self.last_frequency = 0
+        self.estimate_seq = 0
+        # Numéro de la dernière fenêtre analysée (lue par le panneau spectre)
+        self.frame_seq = 0
+        self.rendered_seq = 0
+        self.coalesced_updates = 0
+        self.render_interval = max(1, int(1000 / fps))
+        # Derniers textes/couleurs appliqués, pour ne reconfigurer que ce qui change
+        self.label_cache = {}
+        
+        # Diffusion optionnelle des estimations (voir pitch_server.PitchServer)
+        self.server = server
+        
         # Création des éléments de l'interface graphique
         self.create_gui()
         
-        # Démarrage du thread de traitement audio
+        # Démarrage du thread de traitement audio (inutile si un processus enfant analyse)
         self.running = True
-        self.audio_thread = threading.Thread(target=self.process_audio)
-        self.audio_thread.start()
+        self.audio_thread = None
+        if not self.process_mode:
+            self.audio_thread = threading.Thread(target=self.process_audio, daemon=True)
+            self.audio_thread.start()
+        
+        # Démarrage de la boucle de rendu
+        self.root.after(self.render_interval, self.render_loop)
+        
+        # Revalidation de la liste des périphériques sans bloquer l'affichage
+        self.refresh_devices(reinitialize=False)
+        
+        # Statistiques : affichage superposé (F2) et export JSON périodique
+        self.stats_label = None
+        if stats:
+            self.create_stats_overlay()
+        
+        # Panneau spectre + onde (F3) ; matplotlib n'est importé qu'à l'ouverture
+        self.spectrum_view = SpectrumView(self.root, self.latest_frame, self.ANALYSIS_RATE,
+                                          self.ANALYSIS_WINDOW,
+                                          marker=lambda: self.last_frequency, colors=COLORS)
+        self.root.bind('<F3>', self.toggle_spectrum)
+        if spectrum:
+            self.toggle_spectrum()
+        self.stats_dumper = None
+        if stats_dump:
+            self.stats_dumper = StatsDumper(self.collect_stats, stats_dump, stats_interval)
+            self.stats_dumper.start()
         
         # Configuration de la fermeture correcte de la fenêtre
         self.root.protocol("WM_DELETE_WINDOW", self.close)
+        
+        # Mode embarqué : les objets créés au démarrage (Tk, tables, tampons) ne
+        # sont plus parcourus par le ramasse-miettes, dont les passes restent courtes
+        self.gc_timer = None
+        if self.embedded:
+            gc.collect()
+            gc.freeze()
+            if self.stats.enabled:
+                self.gc_timer = GcTimer(self.stats).start()
     
-    def get_input_devices(self):
-        """Récupère la liste des périphériques d'entrée audio"""
-        devices = []
-        bluetooth_keywords = ['bluetooth', 'bt', 'wireless']  # Keywords to identify Bluetooth devices
+    def configure_analysis(self):
+        """(Re)construit la chaîne d'analyse pour la fréquence d'entrée courante"""
+        factor, rate, window_size, hop_size = analysis_config(self.RATE, self.WINDOW_SIZE,
+                                                              self.HOP_SIZE, self.analysis_rate)
+        self.decimator = Decimator(factor)
+        self.ANALYSIS_RATE = rate
+        self.ANALYSIS_WINDOW = window_size
+        self.ANALYSIS_HOP = hop_size
+        self.window = SlidingWindow(window_size, hop_size)
         
-        for i in range(self.p.get_device_count()):
-            try:
-                device_info = self.p.get_device_info_by_index(i)
-                if device_info['maxInputChannels'] > 0:  # C'est un périphérique d'entrée
-                    name = device_info['name'].lower()
-                    
-                    # Skip Bluetooth devices
-                    if any(keyword in name for keyword in bluetooth_keywords):
-                        print(f"Skipping Bluetooth device: {device_info['name']}")
-                        continue
-                    
-                    # Test if the device can be opened with our settings
-                    try:
-                        test_stream = self.p.open(
-                            format=self.FORMAT,
-                            channels=self.CHANNELS,
-                            rate=self.RATE,
-                            input=True,
-                            input_device_index=i,
-                            frames_per_buffer=self.CHUNK,
-                            start=False  # Don't start the stream, just test if it can be opened
-                        )
-                        test_stream.close()
-                        devices.append((device_info['name'], i))
-                        print(f"Added USB device: {device_info['name']}")
-                    except Exception as e:
-                        print(f"Device {device_info['name']} is not compatible: {str(e)}")
-            except Exception as e:
-                print(f"Error getting device info for index {i}: {str(e)}")
+        # Moteur de détection (voir pitch_detection.DETECTORS)
+        self.detector = create_detector(self.detector_name, rate, window_size,
+                                        low_memory=self.embedded)
+        self.detector.stats = self.stats
+        self.poly_detector = PolyphonicDetector(rate, window_size, self.poly_targets,
+                                                low_memory=self.embedded)
+        self.poly_detector.stats = self.stats
+        target = (self.targeted_detector.target if getattr(self, 'targeted_detector', None)
+                  else self.note_table.string_frequencies[0])
+        self.targeted_detector = TargetedDetector(rate, window_size, target, fallback=self.detector)
+        self.targeted_detector.stats = self.stats
         
+        # Suivi incrémental : recherche complète seulement à l'attaque ou quand la
+        # note est perdue, recherche étroite et lissage médian entre les deux
+        self.tracker = None
+        if self.track:
+            self.tracker = PitchTracker(rate, window_size,
+                                        self.targeted_detector if self.targeted_mode else self.detector,
+                                        a4_freq=self.A4_FREQ, low_memory=self.embedded)
+            self.tracker.stats = self.stats
+        if self.spectrum_view is not None:
+            self.spectrum_view.configure(rate, window_size)
+        print(f"Analyse à {rate:.0f} Hz (entrée {self.RATE} Hz / {factor}), "
+              f"fenêtre {window_size}, pas {hop_size}")
+    
+    def get_input_devices(self):
+        """Récupère la liste des périphériques d'entrée audio (depuis le cache, sans test)"""
+        return cached_devices(self.p, self.device_cache, self.FORMAT, self.CHANNELS,
+                              *self.probe_format())
+    
+    def probe_format(self):
+        """(fréquence, bloc) des clés du cache : 'auto' si le format est négocié"""
+        if self.requested_rate == 'auto':
+            return 'auto', 'auto'
+        return self.RATE, self.CHUNK
+    
+    def refresh_devices(self, reinitialize=True):
+        """Revalide la liste des périphériques en arrière-plan
+        
+        Avec reinitialize, PortAudio est réinitialisé pour prendre en compte les
+        périphériques branchés ou débranchés depuis le lancement.
+        """
+        if self.probing:
+            return
+        self.probing = True
+        if reinitialize:
+            stream, self.stream = self.stream, None
+            if stream is not None:
+                try:
+                    stream.stop_stream()
+                    stream.close()
+                except Exception as e:
+                    print(f"Error closing previous stream: {str(e)}")
+            self.p.terminate()
+            self.p = pyaudio.PyAudio()
+        threading.Thread(target=self.probe_devices_worker, daemon=True).start()
+    
+    def probe_devices_worker(self):
+        """Thread de test des périphériques ; le résultat est appliqué dans le thread Tk
+
+        Instance PyAudio propre au thread : self.p reste réservé au thread Tk
+        (ouverture des flux, négociation) pendant le test.
+        """
+        p = None
+        try:
+            p = pyaudio.PyAudio()
+            in_use = {self.current_device} if self.stream is not None else set()
+            devices = probe_devices(p, self.device_cache, self.FORMAT, self.CHANNELS,
+                                    *self.probe_format(), skip=in_use, min_rate=self.analysis_rate)
+        except Exception as e:
+            print(f"Erreur lors de la détection des périphériques: {str(e)}")
+            devices = self.input_devices
+        finally:
+            if p is not None:
+                p.terminate()
+        if self.running:
+            self.root.after(0, self.apply_device_list, devices)
+    
+    def apply_device_list(self, devices):
+        """Met à jour la liste affichée et rouvre le flux si le périphérique a changé"""
+        self.probing = False
+        self.input_devices = devices
+        self.device_combo['values'] = [name for name, _ in devices]
         if not devices:
-            print("No compatible USB audio devices found")
+            return
         
-        return devices
+        # On garde le périphérique sélectionné s'il est toujours présent
+        # (son index peut avoir changé après réinitialisation)
+        selection = self.device_combo.get()
+        device_index = next((idx for name, idx in devices if name == selection), None)
+        if device_index is None:
+            selection, device_index = devices[0]
+            self.device_combo.set(selection)
+        if device_index != self.current_device or self.stream is None:
+            self.current_device = device_index
+            self.restart_audio_stream()
     
     def on_device_change(self, event):
         """Gestion du changement de périphérique audio"""
@@ -193,6 +408,11 @@ class GuitarTuner:
     
     def restart_audio_stream(self):
         """Redémarre le flux audio avec le nouveau périphérique"""
+        if self.replay is not None:
+            # Relecture : aucun périphérique n'est ouvert
+            self.stream = self.replay
+            return
+        
         # Fermer l'ancien flux s'il existe
         if self.stream is not None:
             try:
@@ -203,15 +423,34 @@ class GuitarTuner:
         
         # Créer un nouveau flux avec le périphérique sélectionné
         try:
+            if not self.negotiate_format():
+                self.stream = None
+                return
+            if self.process_mode:
+                self.stream = SharedCapture(self.current_device, self.RATE, self.CHUNK,
+                                            self.WINDOW_SIZE, self.HOP_SIZE,
+                                            detector=self.detector_name, track=self.track,
+                                            gate=self.use_gate,
+                                            analysis_rate=self.analysis_rate,
+                                            low_memory=self.embedded).start()
+                self.capture_seq = 0
+                print(f"Capture dans un processus séparé pour le périphérique {self.current_device}")
+                return
+            callback = self.audio_callback if self.capture_mode == 'callback' else None
             self.stream = self.p.open(
                 format=self.FORMAT,
                 channels=self.CHANNELS,
                 rate=self.RATE,
                 input=True,
                 input_device_index=self.current_device,
-                frames_per_buffer=self.CHUNK
+                frames_per_buffer=self.CHUNK,
+                stream_callback=callback
             )
-            print(f"Successfully opened audio stream for device index {self.current_device}")
+            self.input_latency = self.stream.get_input_latency()
+            self.stats.gauge('input_latency_ms', round(self.input_latency * 1000, 1))
+            print(f"Successfully opened audio stream for device index {self.current_device} "
+                  f"({self.RATE} Hz, blocs de {self.CHUNK}, latence d'entrée "
+                  f"{self.input_latency * 1000:.1f} ms)")
         except Exception as e:
             error_msg = f"Erreur lors de l'ouverture du périphérique audio: {str(e)}"
             print(error_msg)
@@ -220,20 +459,78 @@ class GuitarTuner:
             # Update UI to show error
             self.show_error_message(error_msg)
     
+    def negotiate_format(self):
+        """Fréquence et taille de bloc négociées pour le périphérique sélectionné
+
+        Renvoie False si le périphérique n'a pas encore été négocié : le test
+        est lancé en arrière-plan et apply_device_list rouvrira le flux.
+        """
+        if self.requested_rate != 'auto' or self.current_device is None:
+            return True
+        entry = negotiated_format(self.p, self.device_cache, self.current_device,
+                                  self.FORMAT, self.CHANNELS)
+        if entry is None:
+            print("Périphérique non encore négocié : test en arrière-plan")
+            self.refresh_devices(reinitialize=False)
+            return False
+        if (entry['rate'], entry['chunk']) != (self.RATE, self.CHUNK):
+            with self.analysis_lock:
+                self.RATE, self.CHUNK = entry['rate'], entry['chunk']
+                self.configure_analysis()
+                if self.gate is not None:
+                    self.gate.configure(self.RATE)
+                # File et bloc de capture à la nouvelle taille ; les blocs en
+                # attente, à l'ancienne fréquence, sont abandonnés
+                queue = self.frame_queue
+                self.frame_queue = FrameQueue(queue.slots, self.CHUNK)
+                self.frame_queue.overruns = queue.overruns
+                self.frame_queue.dropped_frames = queue.dropped_frames
+                self.capture_block = np.zeros(self.CHUNK, dtype=np.float32)
+                if self.recorder is not None:
+                    # Un enregistrement n'a qu'un format (fréquence, taille des
+                    # emplacements) : recréé s'il est vide, terminé sinon
+                    recorder, self.recorder = self.recorder, None
+                    written = recorder.ring.written
+                    recorder.close()
+                    if not written:
+                        self.recorder = Recorder(recorder.ring.path, self.RATE, self.CHUNK,
+                                                 max_seconds=self.record_seconds)
+                    else:
+                        print("Format d'entrée modifié : fin de l'enregistrement")
+        return True
+    
     def show_error_message(self, message):
         """Affiche un message d'erreur dans l'interface"""
         # Update the note display to show error
-        self.detected_note_label.config(text="!", foreground=COLORS['error'])
-        self.octave_label.config(text="Erreur périphérique")
-        self.freq_label.config(text="--")
-        self.cents_label.config(text=message[:20] + "..." if len(message) > 20 else message)
+        self.set_label(self.detected_note_label, text="!", foreground=COLORS['error'])
+        self.set_label(self.octave_label, text="Erreur périphérique")
+        self.set_label(self.freq_label, text="--")
+        self.set_label(self.cents_label, text=message[:20] + "..." if len(message) > 20 else message)
         
         # Reset the needle to center
-        self.canvas.delete("needle")
         canvas_width = 250
         canvas_center = canvas_width // 2
-        self.canvas.create_line(canvas_center, 30, canvas_center, 30, 
-                              fill=COLORS['error'], width=3, tags="needle")
+        self.set_item(self.canvas, self.needle, (canvas_center, 30, canvas_center, 30),
+                      fill=COLORS['error'])
+    
+    def set_label(self, label, **options):
+        """Reconfigure un label uniquement si ses options ont changé"""
+        cached = self.label_cache.setdefault(str(label), {})
+        changed = {key: value for key, value in options.items() if cached.get(key) != value}
+        if changed:
+            label.config(**changed)
+            cached.update(changed)
+    
+    def set_item(self, canvas, item, coords, **options):
+        """Déplace / reconfigure un élément existant du canevas s'il a changé (sans lecture Tk)"""
+        cached = self.label_cache.setdefault((str(canvas), item), {})
+        if cached.get('coords') != coords:
+            canvas.coords(item, *coords)
+            cached['coords'] = coords
+        changed = {key: value for key, value in options.items() if cached.get(key) != value}
+        if changed:
+            canvas.itemconfig(item, **changed)
+            cached.update(changed)
 
     def create_gui(self):
         # Création du cadre principal avec padding et background
@@ -274,6 +571,15 @@ class GuitarTuner:
         self.device_combo.grid(row=0, column=1, padx=5, sticky="ew")
         self.device_combo.bind('<<ComboboxSelected>>', self.on_device_change)
         
+        # Bouton de rafraîchissement (périphériques branchés/débranchés)
+        self.style.configure('Refresh.TButton', padding=(4, 0), font=('Arial', 10, 'bold'))
+        refresh_button = ttk.Button(device_frame,
+                                    text="⟳",
+                                    width=2,
+                                    command=self.refresh_devices,
+                                    style='Refresh.TButton')
+        refresh_button.grid(row=0, column=2, padx=5)
+        
         # Center frames for all elements
         note_frame = ttk.Frame(main_frame, style='TFrame')
         note_frame.grid(row=1, column=0, pady=(20,10), sticky="nsew")
@@ -316,6 +622,13 @@ class GuitarTuner:
         # Dessin de la base de l'aiguille et des marqueurs
         self.draw_tuning_scale()
         
+        # Canevas du mode accord (six aiguilles), à la place du canevas principal
+        self.poly_canvas = tk.Canvas(self.tuning_frame, width=250, height=60, bg=COLORS['secondary'])
+        self.draw_poly_scale()
+        if self.poly_mode:
+            self.canvas.grid_remove()
+            self.poly_canvas.grid(row=0, column=0)
+        
         # Création du sélecteur de cordes avec style moderne
         string_frame = ttk.Frame(main_frame, style='TFrame')
         string_frame.grid(row=6, column=0, pady=10, sticky="nsew")
@@ -326,14 +639,33 @@ class GuitarTuner:
         string_buttons_frame = ttk.Frame(string_frame, style='TFrame')
         string_buttons_frame.grid(row=0, column=0)
         
-        self.string_var = tk.StringVar(value="E2")  # Default to low E
-        strings = [("E2", "E ⬇"), ("A2", "A"), ("D3", "D"), ("G3", "G"), ("B3", "B"), ("E4", "E ⬆")]  # (value, display_text)
-        for value, display_text in strings:
-            ttk.Radiobutton(string_buttons_frame, 
+        strings = self.note_table.strings
+        self.string_var = tk.StringVar(value=strings[0][0])  # Default to low string
+        self.string_buttons = []
+        for value, display_text in strings:  # (value, display_text)
+            button = ttk.Radiobutton(string_buttons_frame, 
                           text=display_text, 
                           variable=self.string_var,
                           value=value, 
-                          style='TRadiobutton').pack(side="left", padx=5)
+                          style='TRadiobutton')
+            button.pack(side="left", padx=5)
+            self.string_buttons.append(button)
+        self.string_var.trace_add('write', self.on_string_change)
+        
+        self.targeted_var = tk.BooleanVar(value=self.targeted_mode)
+        ttk.Checkbutton(string_buttons_frame,
+                        text="Zoom",
+                        variable=self.targeted_var,
+                        command=self.on_targeted_change,
+                        style='TCheckbutton').pack(side="left", padx=5)
+        
+        self.poly_var = tk.BooleanVar(value=self.poly_mode)
+        ttk.Checkbutton(string_buttons_frame,
+                        text="Accord",
+                        variable=self.poly_var,
+                        command=self.on_poly_change,
+                        state='disabled' if self.process_mode else 'normal',
+                        style='TCheckbutton').pack(side="left", padx=5)
         
         # Création du sélecteur de décalage d'accordage avec style moderne
         tuning_frame = ttk.Frame(main_frame, style='TFrame')
@@ -346,9 +678,19 @@ class GuitarTuner:
         tuning_controls_frame.grid(row=0, column=0)
         
         # Style the tuning controls
+        self.tuning_var = tk.StringVar(value=self.note_table.tuning)
+        tuning_combo = ttk.Combobox(tuning_controls_frame,
+                                  textvariable=self.tuning_var,
+                                  width=8,
+                                  style='TCombobox',
+                                  state='readonly')
+        tuning_combo['values'] = list(TUNINGS)
+        tuning_combo.pack(side="left", padx=2)
+        tuning_combo.bind('<<ComboboxSelected>>', self.on_tuning_change)
+        
         ttk.Label(tuning_controls_frame, 
                  text="Décalage:", 
-                 style='TLabel').pack(side="left", padx=5)
+                 style='TLabel').pack(side="left", padx=2)
         
         self.offset_var = tk.StringVar(value="0")
         offset_combo = ttk.Combobox(tuning_controls_frame, 
@@ -358,12 +700,12 @@ class GuitarTuner:
                                   state='readonly',
                                   justify='center')
         offset_combo['values'] = [str(i) for i in range(-12, 13)]
-        offset_combo.pack(side="left", padx=5)
+        offset_combo.pack(side="left", padx=2)
         offset_combo.bind('<<ComboboxSelected>>', self.on_offset_change)
         
         ttk.Label(tuning_controls_frame, 
                  text="demi-tons", 
-                 style='TLabel').pack(side="left", padx=5)
+                 style='TLabel').pack(side="left", padx=2)
         
         # Style the quit button
         quit_frame = ttk.Frame(main_frame, style='TFrame')
@@ -395,32 +737,126 @@ class GuitarTuner:
             self.canvas.create_line(x, 30-height, x, 30+height, fill=COLORS['text'])
             if i % 20 == 0 and i != 0:
                 self.canvas.create_text(x, 50, text=str(i), fill=COLORS['text'], font=("Arial", 8))
+        
+        # Aiguille créée une seule fois, puis déplacée avec canvas.coords
+        self.needle = self.canvas.create_line(canvas_center, 30, canvas_center, 30,
+                                              fill=COLORS['text'], width=3, tags="needle")
+    
+    def draw_poly_scale(self):
+        """Six mini-indicateurs verticaux, un par corde (±50 cents → ±20 px)"""
+        strings = self.note_table.strings
+        column_width = 250 / len(strings)
+        self.poly_needles = []
+        self.poly_labels = []
+        for i, (_, display_text) in enumerate(strings):
+            x = column_width * (i + 0.5)
+            self.poly_canvas.create_line(x - 8, 25, x + 8, 25, fill=COLORS['text'])
+            self.poly_labels.append(self.poly_canvas.create_text(x, 52, text=display_text,
+                                                                 fill=COLORS['text'],
+                                                                 font=("Arial", 9)))
+            self.poly_needles.append(self.poly_canvas.create_line(x, 25, x, 25, width=4,
+                                                                  fill=COLORS['border']))
+    
+    def on_poly_change(self):
+        """Bascule entre le mode une corde et le mode accord"""
+        self.poly_mode = self.poly_var.get()
+        if self.poly_mode:
+            self.canvas.grid_remove()
+            self.poly_canvas.grid(row=0, column=0)
+        else:
+            self.poly_canvas.grid_remove()
+            self.canvas.grid(row=0, column=0)
+    
+    def on_targeted_change(self):
+        self.targeted_mode = self.targeted_var.get()
+        if self.tracker is not None:
+            self.tracker.detector = self.targeted_detector if self.targeted_mode else self.detector
+            self.tracker.reset()
+    
+    def on_string_change(self, *args):
+        """Recentre l'analyse ciblée sur la corde sélectionnée"""
+        values = [value for value, _ in self.note_table.strings]
+        try:
+            index = values.index(self.string_var.get())
+        except ValueError:
+            return
+        self.targeted_detector.set_target(self.note_table.string_frequencies[index])
+    
+    def tuning_color(self, cents):
+        """Couleur de l'aiguille selon la justesse"""
+        if abs(cents) < 5:
+            return COLORS['success']
+        if abs(cents) < 15:
+            return COLORS['warning']
+        return COLORS['error']
     
     def frequency_to_note(self, frequency):
-        if frequency <= 0:
-            return "--", 0, 0
-        
-        # Calcul du numéro de note par rapport à A4
-        note_number = 12 * math.log2(frequency / self.A4_FREQ)
-        # Arrondi à la note la plus proche
-        rounded_note = round(note_number)
-        # Calcul de la déviation en cents
-        cents = 100 * (note_number - rounded_note)
-        
-        # Calcul de l'octave et de la note
-        octave = 4 + (rounded_note + 9) // 12
-        note_index = (rounded_note + 9) % 12
-        note_name = self.NOTES[note_index]
-        
-        return note_name, octave, cents
+        return self.note_table.frequency_to_note(frequency)
     
     def on_offset_change(self, event):
         try:
             self.semitone_offset = int(self.offset_var.get())
-            self.update_display(self.last_frequency if hasattr(self, 'last_frequency') else 0)
+            self.apply_tuning()
         except ValueError:
             pass
     
+    def on_tuning_change(self, event):
+        self.apply_tuning()
+    
+    def apply_tuning(self):
+        """Reconstruit les tables de notes et les cibles des cordes"""
+        self.note_table = NoteTable(self.A4_FREQ, self.semitone_offset, self.tuning_var.get())
+        self.poly_targets = list(self.note_table.string_frequencies)
+        poly_detector = PolyphonicDetector(self.ANALYSIS_RATE, self.ANALYSIS_WINDOW, self.poly_targets,
+                                           low_memory=self.embedded)
+        poly_detector.stats = self.stats
+        self.poly_detector = poly_detector
+        
+        # Libellés des cordes, en conservant la corde sélectionnée
+        values = [value for value, _ in self.note_table.strings]
+        selected = next((i for i, button in enumerate(self.string_buttons)
+                         if button.cget('value') == self.string_var.get()), 0)
+        for button, label, (value, display_text) in zip(self.string_buttons, self.poly_labels,
+                                                        self.note_table.strings):
+            button.config(text=display_text, value=value)
+            self.poly_canvas.itemconfig(label, text=display_text)
+        self.string_var.set(values[selected])
+        self.update_display(self.last_frequency)
+    
+    def audio_callback(self, in_data, frame_count, time_info, status):
+        """Callback PyAudio : transfère le bloc reçu sans jamais attendre l'analyse"""
+        if status & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        self.frame_queue.push(np.frombuffer(in_data, dtype=np.float32))
+        return (None, pyaudio.paContinue)
+    
+    def read_audio(self):
+        """Alimente la fenêtre glissante ; renvoie True si une analyse est due"""
+        if self.capture_mode != 'callback':
+            data = self.stream.read(self.CHUNK, exception_on_overflow=False)
+            return self.feed(np.frombuffer(data, dtype=np.float32)) > 0
+        
+        n = self.frame_queue.pop(self.capture_block, timeout=0.1)
+        if not n:
+            return False
+        self.stats.gauge('queue_depth', len(self.frame_queue))
+        ready = self.feed(self.capture_block[:n])
+        # Rattrapage : on vide la file pour analyser les données les plus récentes
+        while True:
+            n = self.frame_queue.pop(self.capture_block)
+            if not n:
+                break
+            ready += self.feed(self.capture_block[:n])
+        return ready > 0
+    
+    def feed(self, block):
+        """Transmet un bloc à la porte d'énergie et à la fenêtre glissante"""
+        if self.recorder is not None:
+            self.recorder.append(block)
+        ready, onset = pipeline.feed(block, self.decimator, self.window, self.gate)
+        self.onset_pending = self.onset_pending or onset
+        return ready
+    
     def process_audio(self):
         while self.running:
             if self.stream is None:
@@ -428,22 +864,51 @@ class GuitarTuner:
                 continue
                 
             try:
-                data = self.stream.read(self.CHUNK, exception_on_overflow=False)
-                audio_data = np.frombuffer(data, dtype=np.float32)
-                
-                # Exécution de la FFT
-                fft_data = fft(audio_data)
-                freqs = np.fft.fftfreq(len(fft_data), 1/self.RATE)
-                
-                # Recherche de la fréquence dominante
-                magnitude_spectrum = np.abs(fft_data)
-                peak_index = np.argmax(magnitude_spectrum)
-                peak_freq = abs(freqs[peak_index])
+                # Verrou : la configuration d'analyse peut être reconstruite depuis Tk
+                with self.analysis_lock:
+                    t0 = self.stats.clock()
+                    ready = self.read_audio()
+                    self.stats.record('read', t0)
+                    active = self.gate is None or self.gate.active
+                    if self.cpu_meter is not None:
+                        self.cpu_meter.switch('active' if active else 'idle')
+                    if not ready:
+                        continue
+                    self.block_time = time.perf_counter()
+                    if pipeline.gated(self.gate, self.tracker):
+                        # Silence : le bloc est conservé dans la fenêtre mais pas analysé
+                        self.stats.count('gated_frames')
+                        continue
                 
-                # Mise à jour uniquement si l'amplitude est significative (réduction du bruit)
-                if magnitude_spectrum[peak_index] > 0.01:
-                    self.last_frequency = peak_freq
-                    self.root.after(0, self.update_display, peak_freq)
+                    # Détection de la hauteur sur la fenêtre glissante
+                    # (fréquence nulle si le signal est trop faible)
+                    t0 = self.stats.clock()
+                    frame = self.window.current_frame()
+                    self.frame_seq += 1
+                    if self.poly_mode:
+                        estimates = self.poly_detector.detect(frame)
+                        self.stats.record('detect', t0)
+                        if any(estimate.frequency > 0 for estimate in estimates):
+                            self.last_poly = estimates
+                            self.estimate_seq += 1
+                            if self.server is not None and self.server.active:
+                                self.server.publish({
+                                    'timestamp': round(time.time(), 4),
+                                    'strings': [self.pitch_event(e) for e in estimates],
+                                })
+                        continue
+                    onset, self.onset_pending = self.onset_pending, False
+                    detector = self.targeted_detector if self.targeted_mode else self.detector
+                    estimate = pipeline.analyse(frame, detector, self.tracker, onset)
+                    self.stats.record('detect', t0)
+                    if estimate.frequency > 0:
+                        # Publication : la boucle de rendu lira la valeur la plus récente
+                        self.last_frequency = estimate.frequency
+                        self.estimate_time = self.block_time
+                        self.estimate_seq += 1
+                        if self.server is not None and self.server.active:
+                            self.server.publish({'timestamp': round(time.time(), 4),
+                                                 **self.pitch_event(estimate)})
                 
             except Exception as e:
                 if self.running:
@@ -459,34 +924,155 @@ class GuitarTuner:
             except Exception as e:
                 print(f"Error closing stream during shutdown: {str(e)}")
     
+    def pitch_event(self, estimate):
+        """Représentation compacte d'une estimation pour la diffusion"""
+        note, octave, cents = self.frequency_to_note(estimate.frequency)
+        return {
+            'freq': round(estimate.frequency, 3),
+            'note': note,
+            'octave': octave,
+            'cents': round(cents, 2),
+            'confidence': round(estimate.confidence, 3),
+        }
+    
+    def render_loop(self):
+        """Rafraîchit l'affichage à cadence fixe avec la dernière estimation publiée"""
+        if not self.running:
+            return
+        if self.process_mode and self.stream is not None:
+            self.poll_capture()
+        seq = self.estimate_seq
+        if seq != self.rendered_seq:
+            # Les estimations arrivées entre deux rendus sont fusionnées
+            self.coalesced_updates += seq - self.rendered_seq - 1
+            self.rendered_seq = seq
+            t0 = self.stats.clock()
+            if self.poly_mode:
+                self.update_poly_display(self.last_poly)
+            else:
+                self.update_display(self.last_frequency)
+                self.measure_latency()
+            self.stats.record('render', t0)
+        self.root.after(self.render_interval, self.render_loop)
+    
+    def measure_latency(self):
+        """Latence entrée → affichage : PortAudio, remplissage d'un bloc, analyse et rendu"""
+        if not self.estimate_time:
+            return
+        self.display_latency = (self.input_latency + self.CHUNK / self.RATE
+                                + time.perf_counter() - self.estimate_time)
+        self.stats.gauge('input_to_display_ms', round(self.display_latency * 1000, 1))
+    
+    def poll_capture(self):
+        """Mode processus : lit le dernier résultat en mémoire partagée"""
+        capture = self.stream
+        error = capture.error()
+        if error:
+            self.show_error_message(f"Erreur lors du traitement audio: {error}")
+        capture.set_target(self.targeted_detector.target, self.targeted_mode)
+        seq, estimate, timestamp = capture.latest()
+        if estimate is None or seq == self.capture_seq:
+            return
+        self.capture_seq = seq
+        self.last_frequency = estimate.frequency
+        # Horodatage de l'enfant (horloge murale) ramené à perf_counter
+        self.estimate_time = time.perf_counter() - (time.time() - timestamp)
+        self.estimate_seq += 1
+        if self.server is not None and self.server.active:
+            self.server.publish({'timestamp': round(time.time(), 4), **self.pitch_event(estimate)})
+    
+    def collect_stats(self):
+        """Instantané des statistiques, compteurs du pipeline inclus"""
+        snapshot = self.stats.snapshot()
+        snapshot.setdefault('counters', {}).update(
+            input_overflows=self.input_overflows,
+            overruns=self.frame_queue.overruns,
+            dropped_frames=self.frame_queue.dropped_frames,
+            estimates=self.estimate_seq,
+            coalesced_updates=self.coalesced_updates,
+        )
+        if self.process_mode:
+            # La porte tourne dans le processus enfant : la porte locale ne voit rien
+            if self.stream is not None:
+                snapshot['counters'].update(self.stream.counters())
+                snapshot['gauges'] = {**snapshot.get('gauges', {}), **self.stream.gauges()}
+        elif self.gate is not None:
+            snapshot['counters'].update(onsets=self.gate.onsets)
+            snapshot['gauges'] = {**snapshot.get('gauges', {}),
+                                  'noise_floor': round(self.gate.noise_floor or 0.0, 6)}
+        if self.server is not None:
+            snapshot['counters'].update(self.server.stats())
+        return snapshot
+    
+    def create_stats_overlay(self):
+        """Crée l'affichage superposé des statistiques (basculé avec F2)"""
+        self.stats_label = tk.Label(self.root, font=("Courier", 7), justify="left", anchor="nw",
+                                    bg=COLORS['secondary'], fg=COLORS['text'])
+        self.stats_label.place(x=5, y=5)
+        self.root.bind('<F2>', self.toggle_stats_overlay)
+        self.update_stats_overlay()
+    
+    def toggle_stats_overlay(self, event=None):
+        if self.stats_label.winfo_ismapped():
+            self.stats_label.place_forget()
+        else:
+            self.stats_label.place(x=5, y=5)
+    
+    def update_stats_overlay(self):
+        if not self.running:
+            return
+        if self.stats_label.winfo_ismapped():
+            self.set_label(self.stats_label, text=format_overlay(self.collect_stats()))
+        self.root.after(500, self.update_stats_overlay)
+    
+    def latest_frame(self):
+        """Dernière fenêtre analysée (tampon partagé, sans copie)"""
+        if self.process_mode and self.stream is not None:
+            return self.stream.latest_frame()
+        return self.frame_seq, self.window.frame
+    
+    def toggle_spectrum(self, event=None):
+        """Affiche ou masque le panneau spectre sous l'accordeur"""
+        if self.spectrum_view.visible:
+            self.spectrum_view.hide()
+            self.root.geometry("400x600")
+        else:
+            self.root.geometry("400x820")
+            self.spectrum_view.show(row=1, column=0, pady=(0, 10))
+    
     def update_display(self, frequency):
         # Obtention des informations de la note
         note, octave, cents = self.frequency_to_note(frequency)
         
         # Mise à jour des affichages
-        self.freq_label.config(text=f"{frequency:.1f} Hz")
-        self.detected_note_label.config(text=note)
-        self.octave_label.config(text=f"Octave: {octave}")
-        self.cents_label.config(text=f"± {abs(cents):.0f} cents")
+        self.set_label(self.freq_label, text=f"{frequency:.1f} Hz")
+        self.set_label(self.detected_note_label, text=note)
+        self.set_label(self.octave_label, text=f"Octave: {octave}")
+        self.set_label(self.cents_label, text=f"± {abs(cents):.0f} cents")
         
         # Mise à jour de la position de l'aiguille
-        self.canvas.delete("needle")
         canvas_width = 250
         canvas_center = canvas_width // 2
-        needle_x = canvas_center + (cents * 1.25)  # Adjusted scale factor to match new width
+        # Position arrondie au pixel : une aiguille immobile ne coûte aucun appel Tk
+        needle_x = round(canvas_center + (cents * 1.25))  # Adjusted scale factor to match new width
         
         # Change needle color based on tuning accuracy
-        if abs(cents) < 5:
-            needle_color = COLORS['success']
-            self.detected_note_label.config(foreground=COLORS['success'])
-        elif abs(cents) < 15:
-            needle_color = COLORS['warning']
-            self.detected_note_label.config(foreground=COLORS['warning'])
-        else:
-            needle_color = COLORS['error']
-            self.detected_note_label.config(foreground=COLORS['error'])
+        needle_color = self.tuning_color(cents)
+        self.set_label(self.detected_note_label, foreground=needle_color)
             
-        self.canvas.create_line(canvas_center, 30, needle_x, 30, fill=needle_color, width=3, tags="needle")
+        self.set_item(self.canvas, self.needle, (canvas_center, 30, needle_x, 30), fill=needle_color)
+    
+    def update_poly_display(self, estimates):
+        """Met à jour les six aiguilles ; les cordes non détectées restent inchangées"""
+        column_width = 250 / len(self.poly_needles)
+        for i, (needle, estimate, target) in enumerate(zip(self.poly_needles, estimates,
+                                                           self.poly_targets)):
+            if estimate.frequency <= 0:
+                continue
+            cents = max(-50.0, min(50.0, 1200 * math.log2(estimate.frequency / target)))
+            x = column_width * (i + 0.5)
+            self.set_item(self.poly_canvas, needle, (x, 25, x, round(25 - cents * 0.4)),
+                          fill=self.tuning_color(cents))
 
     def close(self):
         """Arrêt correct de l'application"""
@@ -494,31 +1080,118 @@ class GuitarTuner:
         
         # Signal d'arrêt du thread audio
         self.running = False
+        if self.gc_timer is not None:
+            self.gc_timer.stop()
+        if self.stats_dumper:
+            self.stats_dumper.stop()
+        if self.server is not None:
+            self.server.stop()
         
         try:
-            # Attente de la fin du thread audio avec timeout court
-            if self.audio_thread.is_alive():
+            # Attente de la fin du thread audio avec timeout court (il ferme le flux)
+            if self.audio_thread is not None and self.audio_thread.is_alive():
                 self.audio_thread.join(timeout=0.5)
+            
+            # Mode processus : arrêt coopératif de l'enfant et libération de la mémoire partagée
+            stream, self.stream = self.stream, None
+            if self.process_mode and stream is not None:
+                stream.stop()
+            
+            # Enregistrement : les blocs déjà écrits sont conservés sur disque
+            recorder, self.recorder = self.recorder, None
+            if recorder is not None:
+                recorder.close()
                 
-            # Forcer l'arrêt de PyAudio même si le thread est toujours actif
+            # Arrêt de PyAudio (le thread audio, démon, ne retient pas la sortie)
             if hasattr(self, 'p') and self.p:
                 try:
                     self.p.terminate()
                 except:
                     pass
-            
-            # Destruction de la fenêtre
-            if self.root:
-                self.root.quit()
-                self.root.destroy()
-                
         except Exception as e:
             print(f"Erreur lors de l'arrêt: {e}")
         finally:
-            # Forcer la sortie de l'application
-            os._exit(0)
+            # Destruction de la fenêtre : mainloop() se termine et le programme aussi
+            if self.root:
+                self.root.quit()
+                self.root.destroy()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accordeur de guitare")
+    parser.add_argument('--detector', choices=sorted(DETECTORS), default='fft',
+                        help="algorithme de détection de hauteur")
+    parser.add_argument('--window', type=int, default=8192,
+                        help="taille de la fenêtre d'analyse en échantillons (résolution)")
+    parser.add_argument('--hop', type=int, default=512,
+                        help="pas entre deux analyses en échantillons (cadence)")
+    parser.add_argument('--rate', type=lambda value: value if value == 'auto' else int(value),
+                        default='auto',
+                        help="fréquence d'entrée en Hz ('auto' : négociée par périphérique)")
+    parser.add_argument('--analysis-rate', type=int, default=ANALYSIS_RATE,
+                        help="fréquence d'analyse visée après décimation")
+    parser.add_argument('--embedded', action='store_true',
+                        help="mode embarqué : aucune allocation par trame dans l'analyse")
+    parser.add_argument('--capture', choices=['callback', 'blocking'], default='callback',
+                        help="mode de capture PyAudio")
+    parser.add_argument('--fps', type=int, default=30,
+                        help="cadence maximale de rafraîchissement de l'affichage")
+    parser.add_argument('--tuning', choices=list(TUNINGS), default='Standard',
+                        help="accordage des cordes à vide")
+    parser.add_argument('--no-gate', dest='gate', action='store_false',
+                        help="analyse aussi pendant les silences (désactive la porte d'énergie)")
+    parser.add_argument('--targeted', action='store_true',
+                        help="analyse fine autour de la corde sélectionnée (mode zoom)")
+    parser.add_argument('--no-track', dest='track', action='store_false',
+                        help="analyse complète de chaque trame, sans suivi ni lissage")
+    parser.add_argument('--process', action='store_true',
+                        help="capture et détection dans un processus séparé (mémoire partagée)")
+    parser.add_argument('--poly', action='store_true',
+                        help="démarre en mode accord (six cordes à la fois)")
+    parser.add_argument('--serve', type=int, nargs='?', const=8765, metavar='PORT',
+                        help="diffuse les estimations en JSON lines sur 127.0.0.1:PORT")
+    parser.add_argument('--serve-unix', metavar='CHEMIN',
+                        help="diffuse les estimations sur une socket Unix")
+    parser.add_argument('--record', metavar='FICHIER',
+                        help="enregistre l'entrée brute dans un fichier anneau (voir recording.py)")
+    parser.add_argument('--record-seconds', type=float, default=60.0,
+                        help="durée conservée par l'enregistrement (les blocs plus anciens sont écrasés)")
+    parser.add_argument('--replay', metavar='FICHIER',
+                        help="relit un enregistrement à la place du périphérique d'entrée")
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help="vitesse de relecture (1 = temps réel, 0 = sans attente)")
+    parser.add_argument('--spectrum', action='store_true',
+                        help="affiche le panneau spectre et forme d'onde (F3 pour basculer)")
+    parser.add_argument('--stats', action='store_true',
+                        help="affiche les statistiques du pipeline (F2 pour masquer)")
+    parser.add_argument('--stats-dump', metavar='FICHIER',
+                        help="écrit périodiquement les statistiques en JSON ('-' pour stdout)")
+    parser.add_argument('--stats-interval', type=float, default=1.0,
+                        help="période d'écriture des statistiques en secondes")
+    args = parser.parse_args()
+    if args.process and not args.replay:
+        # Le processus enfant capture en mode callback et n'exécute que la détection
+        if args.poly:
+            parser.error("--poly n'est pas disponible avec --process")
+        if args.record:
+            parser.error("--record n'est pas disponible avec --process")
+        if args.capture != 'callback':
+            print(f"--capture {args.capture} ignoré avec --process (capture en mode callback)",
+                  file=sys.stderr)
+    
+    server = None
+    if args.serve or args.serve_unix:
+        server = PitchServer(port=args.serve, path=args.serve_unix)
+        server.start()
+    
     root = tk.Tk()
-    app = GuitarTuner(root)
+    app = GuitarTuner(root, detector=args.detector,
+                      window_size=args.window, hop_size=args.hop,
+                      capture_mode=args.capture, fps=args.fps, stats=args.stats,
+                      stats_dump=args.stats_dump, stats_interval=args.stats_interval,
+                      poly=args.poly, server=server, tuning=args.tuning, gate=args.gate,
+                      targeted=args.targeted, track=args.track, spectrum=args.spectrum,
+                      record=args.record,
+                      record_seconds=args.record_seconds, replay=args.replay,
+                      replay_speed=args.replay_speed, process=args.process,
+                      rate=args.rate, analysis_rate=args.analysis_rate, embedded=args.embedded)
     root.mainloop() 
\ No newline at end of file
@@ -0,0 +1,230 @@
+"""Instrumentation du chemin critique : durée des étapes, compteurs et jauges.
+
+Le code instrumenté appelle toujours la même API::
+
+    t0 = stats.clock()
+    ...
+    stats.record('fft', t0)
+
+Lorsque l'instrumentation est désactivée, on utilise ``NULL_STATS`` dont les
+méthodes ne font rien : le coût se limite à deux appels de méthode vides.
+"""
+import gc
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+
+class StageTimer:
+    """Durées d'une étape : cumul, maximum et échantillons récents (percentiles)"""
+    __slots__ = ('count', 'total_ns', 'max_ns', 'recent', 'pos')
+
+    def __init__(self, history=512):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.recent = np.zeros(history, dtype=np.int64)
+        self.pos = 0
+
+    def add(self, elapsed_ns):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.recent[self.pos] = elapsed_ns
+        self.pos = (self.pos + 1) % len(self.recent)
+
+    def summary(self):
+        recent = self.recent[:min(self.count, len(self.recent))] / 1000.0
+        summary = {
+            'count': self.count,
+            'mean_us': round(self.total_ns / self.count / 1000.0, 1) if self.count else 0.0,
+            'max_us': round(self.max_ns / 1000.0, 1),
+        }
+        if len(recent):
+            p50, p99 = np.percentile(recent, (50, 99))
+            summary.update(p50_us=round(float(p50), 1), p99_us=round(float(p99), 1))
+        return summary
+
+
+class Stats:
+    """Chronométrage des étapes et compteurs du pipeline audio"""
+    enabled = True
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self.gauges = {}
+        self.started = time.time()
+        # Charge CPU du processus entre deux instantanés
+        self.last_process_time = time.process_time()
+        self.last_snapshot = time.perf_counter()
+        # Charge du thread d'analyse par état (voir CpuMeter), optionnelle
+        self.cpu_meter = None
+
+    @staticmethod
+    def clock():
+        return time.perf_counter_ns()
+
+    def record(self, stage, t0):
+        """Enregistre la durée écoulée depuis t0 (obtenu par clock()) pour une étape"""
+        elapsed = time.perf_counter_ns() - t0
+        timer = self.stages.get(stage)
+        if timer is None:
+            timer = self.stages[stage] = StageTimer()
+        timer.add(elapsed)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        self.gauges[name] = value
+
+    def snapshot(self):
+        """État courant sous forme de dict sérialisable en JSON"""
+        process_time, now = time.process_time(), time.perf_counter()
+        elapsed = now - self.last_snapshot
+        gauges = dict(self.gauges)
+        if elapsed > 0:
+            gauges['process_cpu_percent'] = round(100 * (process_time - self.last_process_time) / elapsed, 1)
+        rss = resident_kb()
+        if rss is not None:
+            gauges['rss_kb'] = rss
+        self.last_process_time, self.last_snapshot = process_time, now
+        if self.cpu_meter is not None:
+            for state, percent in self.cpu_meter.percentages().items():
+                gauges[f'analysis_cpu_{state}_percent'] = percent
+        return {
+            'timestamp': round(time.time(), 3),
+            'uptime_s': round(time.time() - self.started, 1),
+            'stages': {name: timer.summary() for name, timer in list(self.stages.items())},
+            'counters': dict(self.counters),
+            'gauges': gauges,
+        }
+
+
+class CpuMeter:
+    """Temps CPU d'un thread ventilé par état (par exemple 'idle' / 'active')
+
+    ``switch`` doit être appelé depuis le thread mesuré (time.thread_time).
+    """
+
+    def __init__(self):
+        self.state = None
+        self.cpu = {}
+        self.wall = {}
+        self.last_cpu = 0.0
+        self.last_wall = 0.0
+
+    def switch(self, state):
+        cpu = time.thread_time()
+        wall = time.perf_counter()
+        if self.state is not None:
+            self.cpu[self.state] = self.cpu.get(self.state, 0.0) + cpu - self.last_cpu
+            self.wall[self.state] = self.wall.get(self.state, 0.0) + wall - self.last_wall
+        self.state = state
+        self.last_cpu = cpu
+        self.last_wall = wall
+
+    def percentages(self):
+        """Charge CPU (% d'un cœur) passée dans chaque état"""
+        return {state: round(100 * self.cpu[state] / wall, 2)
+                for state, wall in list(self.wall.items()) if wall > 0}
+
+
+class GcTimer:
+    """Durée des passes du ramasse-miettes, par génération (étapes 'gc0' à 'gc2')"""
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.t0 = 0
+
+    def __call__(self, phase, info):
+        if phase == 'start':
+            self.t0 = self.stats.clock()
+        else:
+            self.stats.record(f"gc{info['generation']}", self.t0)
+
+    def start(self):
+        gc.callbacks.append(self)
+        return self
+
+    def stop(self):
+        if self in gc.callbacks:
+            gc.callbacks.remove(self)
+
+
+def resident_kb():
+    """Mémoire résidente du processus en Kio (Linux), None si indisponible"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * (os.sysconf('SC_PAGE_SIZE') // 1024)
+
+
+class NullStats:
+    """Instrumentation désactivée : toutes les opérations sont vides"""
+    enabled = False
+
+    @staticmethod
+    def clock():
+        return 0
+
+    def record(self, stage, t0):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def gauge(self, name, value):
+        pass
+
+    def snapshot(self):
+        return {}
+
+
+NULL_STATS = NullStats()
+
+
+class StatsDumper(threading.Thread):
+    """Écrit périodiquement un instantané JSON (une ligne par instantané)
+
+    ``collect`` est appelé à chaque période et renvoie le dict à écrire ;
+    ``path`` vaut '-' pour la sortie standard.
+    """
+
+    def __init__(self, collect, path='-', interval=1.0):
+        super().__init__(daemon=True)
+        self.collect = collect
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        out = sys.stdout if self.path == '-' else open(self.path, 'a')
+        try:
+            while not self.stopped.wait(self.interval):
+                out.write(json.dumps(self.collect()) + '\n')
+                out.flush()
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def format_overlay(snapshot):
+    """Résumé compact d'un instantané pour l'affichage dans l'interface"""
+    lines = []
+    for name, stage in snapshot.get('stages', {}).items():
+        lines.append(f"{name}: {stage['mean_us']:.0f} µs (p99 {stage.get('p99_us', 0):.0f})")
+    for name, value in {**snapshot.get('counters', {}), **snapshot.get('gauges', {})}.items():
+        lines.append(f"{name}: {value}")
+    return "\n".join(lines)
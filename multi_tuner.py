@@ -0,0 +1,191 @@
+"""Accordage simultané sur plusieurs entrées (banc de test multi-instruments).
+
+Chaque périphérique est capturé et analysé dans son propre processus (donc sur
+son propre cœur, sans partager le GIL avec Tk). Les canaux d'une interface
+multicanale sont analysés séparément dans le processus de ce périphérique.
+Les résultats remontent par une file vers un tableau de bord Tk minimal.
+
+    python multi_tuner.py --device 2 --device 5
+    python multi_tuner.py --device 3 --channels 4
+"""
+import argparse
+import multiprocessing as mp
+import queue
+import time
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+from audio_buffer import FrameQueue, SlidingWindow
+from notes import frequency_to_note
+from pitch_detection import DETECTORS, create_detector
+
+COLORS = {
+    'background': '#2C3E50',
+    'text': '#ECF0F1',
+    'success': '#2ECC71',
+    'warning': '#F1C40F',
+    'error': '#E74C3C',
+}
+
+
+def capture_worker(device_index, channels, detector, rate, window_size, hop_size, results, stop):
+    """Processus de capture et d'analyse d'un périphérique
+
+    Messages envoyés : ('ready', clé, nom), ('pitch', clé, fréquence, confiance,
+    trames analysées) et ('error', clé, message), avec clé = (périphérique, canal).
+    """
+    import pyaudio
+
+    p = pyaudio.PyAudio()
+    stream = None
+    frame_queue = FrameQueue(64, hop_size * channels)
+
+    def callback(in_data, frame_count, time_info, status):
+        frame_queue.push(np.frombuffer(in_data, dtype=np.float32))
+        return (None, pyaudio.paContinue)
+
+    try:
+        name = p.get_device_info_by_index(device_index)['name']
+        stream = p.open(
+            format=pyaudio.paFloat32,
+            channels=channels,
+            rate=rate,
+            input=True,
+            input_device_index=device_index,
+            frames_per_buffer=hop_size,
+            stream_callback=callback
+        )
+        for channel in range(channels):
+            results.put(('ready', (device_index, channel), name))
+
+        windows = [SlidingWindow(window_size, hop_size) for _ in range(channels)]
+        detectors = [create_detector(detector, rate, window_size) for _ in range(channels)]
+        analysed = [0] * channels
+        block = np.zeros(hop_size * channels, dtype=np.float32)
+        while not stop.is_set():
+            n = frame_queue.pop(block, timeout=0.1)
+            if not n:
+                continue
+            # Désentrelacement : une colonne par canal
+            frames = block[:n].reshape(-1, channels)
+            for channel in range(channels):
+                if not windows[channel].push(frames[:, channel]):
+                    continue
+                estimate = detectors[channel].detect(windows[channel].current_frame())
+                analysed[channel] += 1
+                if estimate.frequency > 0:
+                    try:
+                        results.put_nowait(('pitch', (device_index, channel), estimate.frequency,
+                                            estimate.confidence, analysed[channel]))
+                    except queue.Full:
+                        # Le tableau de bord est en retard : l'estimation suivante suffira
+                        pass
+    except Exception as e:
+        results.put(('error', (device_index, 0), str(e)))
+    finally:
+        if stream is not None:
+            stream.stop_stream()
+            stream.close()
+        p.terminate()
+
+
+class Dashboard:
+    """Tableau de bord : une ligne par entrée, dernière estimation uniquement"""
+
+    def __init__(self, root, results, refresh_ms=33):
+        self.root = root
+        self.results = results
+        self.refresh_ms = refresh_ms
+        self.rows = {}
+        self.started = time.perf_counter()
+        self.root.title("Guitar Tuner - Multi")
+        self.root.configure(bg=COLORS['background'])
+        self.frame = ttk.Frame(root, padding="10")
+        self.frame.grid(row=0, column=0, sticky="nsew")
+        style = ttk.Style()
+        style.configure('Dashboard.TLabel', background=COLORS['background'],
+                        foreground=COLORS['text'], font=('Arial', 14))
+        style.configure('TFrame', background=COLORS['background'])
+        self.root.after(self.refresh_ms, self.poll)
+
+    def row(self, key, name=None):
+        if key not in self.rows:
+            labels = [ttk.Label(self.frame, width=width, style='Dashboard.TLabel')
+                      for width in (28, 5, 12, 12, 10)]
+            for column, label in enumerate(labels):
+                label.grid(row=len(self.rows), column=column, padx=5, pady=3, sticky="w")
+            device, channel = key
+            labels[0].config(text=f"{name or device} [{channel + 1}]")
+            self.rows[key] = labels
+        return self.rows[key]
+
+    def poll(self):
+        """Vide la file et n'affiche que la dernière estimation de chaque entrée"""
+        latest = {}
+        try:
+            while True:
+                message = self.results.get_nowait()
+                kind, key = message[0], message[1]
+                if kind == 'ready':
+                    self.row(key, message[2])
+                elif kind == 'error':
+                    self.row(key)[1].config(text="!", foreground=COLORS['error'])
+                    self.row(key)[2].config(text=message[2][:30])
+                else:
+                    latest[key] = message[2:]
+        except queue.Empty:
+            pass
+
+        elapsed = time.perf_counter() - self.started
+        for key, (frequency, confidence, analysed) in latest.items():
+            note, octave, cents = frequency_to_note(frequency)
+            color = (COLORS['success'] if abs(cents) < 5 else
+                     COLORS['warning'] if abs(cents) < 15 else COLORS['error'])
+            labels = self.row(key)
+            labels[1].config(text=f"{note}{octave}", foreground=color)
+            labels[2].config(text=f"{cents:+.0f} cents")
+            labels[3].config(text=f"{frequency:.1f} Hz")
+            labels[4].config(text=f"{analysed / elapsed:.0f} tr/s")
+        self.root.after(self.refresh_ms, self.poll)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Accordage simultané sur plusieurs entrées")
+    parser.add_argument('--device', type=int, action='append', required=True,
+                        help="index PyAudio d'un périphérique (option répétable)")
+    parser.add_argument('--channels', type=int, default=1,
+                        help="nombre de canaux à ouvrir sur chaque périphérique")
+    parser.add_argument('--detector', choices=sorted(DETECTORS), default='fft')
+    parser.add_argument('--rate', type=int, default=44100)
+    parser.add_argument('--window', type=int, default=8192)
+    parser.add_argument('--hop', type=int, default=512)
+    args = parser.parse_args(argv)
+
+    # 'spawn' : chaque processus démarre avec son propre PortAudio
+    context = mp.get_context('spawn')
+    results = context.Queue(maxsize=1024)
+    stop = context.Event()
+    workers = [context.Process(target=capture_worker,
+                               args=(device, args.channels, args.detector, args.rate,
+                                     args.window, args.hop, results, stop),
+                               daemon=True)
+               for device in args.device]
+    for worker in workers:
+        worker.start()
+
+    root = tk.Tk()
+    Dashboard(root, results)
+    try:
+        root.mainloop()
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join(timeout=1.0)
+            if worker.is_alive():
+                worker.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Conversion fréquence → note, sans dépendance à l'interface graphique.
+
+``frequency_to_note`` convertit une valeur à la fois. ``NoteTable`` convertit
+des tableaux NumPy entiers en un seul appel, à partir de tables précalculées
+pour un La de référence, un décalage en demi-tons et un accordage donnés.
+"""
+import math
+
+import numpy as np
+
+NOTES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+A4_FREQ = 440.0
+
+# Cordes à vide en accordage standard : (valeur, texte affiché)
+STRINGS = [("E2", "E ⬇"), ("A2", "A"), ("D3", "D"), ("G3", "G"), ("B3", "B"), ("E4", "E ⬆")]
+
+# Accordages alternatifs, de la corde la plus grave à la plus aiguë
+TUNINGS = {
+    'Standard': ['E2', 'A2', 'D3', 'G3', 'B3', 'E4'],
+    'Drop D': ['D2', 'A2', 'D3', 'G3', 'B3', 'E4'],
+    'DADGAD': ['D2', 'A2', 'D3', 'G3', 'A3', 'D4'],
+    'Open G': ['D2', 'G2', 'D3', 'G3', 'B3', 'D4'],
+}
+
+
+def tuning_strings(tuning):
+    """Cordes d'un accordage au format de STRINGS : (valeur, texte affiché)"""
+    names = TUNINGS[tuning]
+    labels = [name[:-1] for name in names]
+    labels[0] += " ⬇"
+    labels[-1] += " ⬆"
+    return list(zip(names, labels))
+
+
+def note_frequency(name, a4_freq=A4_FREQ):
+    """Fréquence d'une note écrite sous la forme 'E2', 'C#4'..."""
+    note, octave = name[:-1], int(name[-1])
+    semitones = NOTES.index(note) - 9 + 12 * (octave - 4)
+    return a4_freq * 2 ** (semitones / 12)
+
+
+def frequency_to_note(frequency, a4_freq=A4_FREQ):
+    """Renvoie (nom de la note, octave, écart en cents) pour une fréquence en Hz"""
+    if frequency <= 0:
+        return "--", 0, 0
+    
+    # Calcul du numéro de note par rapport à A4
+    note_number = 12 * math.log2(frequency / a4_freq)
+    # Arrondi à la note la plus proche
+    rounded_note = round(note_number)
+    # Calcul de la déviation en cents
+    cents = 100 * (note_number - rounded_note)
+    
+    # Calcul de l'octave et de la note
+    octave = 4 + (rounded_note + 9) // 12
+    note_index = (rounded_note + 9) % 12
+    note_name = NOTES[note_index]
+    
+    return note_name, octave, cents
+
+
+class NoteTable:
+    """Conversion vectorisée fréquence → (note, octave, cents)
+
+    Le décalage en demi-tons déplace la référence : avec -1 (guitare accordée
+    un demi-ton plus bas), un Mi bémol est affiché comme un Mi juste.
+    """
+
+    def __init__(self, a4_freq=A4_FREQ, semitone_offset=0, tuning='Standard'):
+        self.a4_freq = a4_freq
+        self.semitone_offset = semitone_offset
+        self.tuning = tuning
+        # Tables précalculées pour cette configuration
+        self.reference = a4_freq * 2 ** (semitone_offset / 12)
+        self.log2_reference = math.log2(self.reference)
+        self.names = np.array(NOTES + ['--'])
+        self.strings = tuning_strings(tuning)
+        self.string_frequencies = np.array([note_frequency(name, self.reference)
+                                            for name, _ in self.strings])
+
+    def convert(self, frequencies):
+        """Renvoie (index de note, octave, cents) pour un tableau de fréquences
+
+        Les fréquences nulles ou négatives donnent l'index -1, l'octave 0 et 0 cent.
+        """
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        valid = frequencies > 0
+        note_number = 12 * (np.log2(np.where(valid, frequencies, 1.0)) - self.log2_reference)
+        rounded = np.rint(note_number)
+        cents = np.where(valid, 100 * (note_number - rounded), 0.0)
+        rounded = rounded.astype(np.int64) + 9
+        note_index = np.where(valid, rounded % 12, -1)
+        octave = np.where(valid, 4 + rounded // 12, 0)
+        return note_index, octave, cents
+
+    def note_names(self, note_index):
+        """Noms des notes pour un tableau d'index (-1 → '--')"""
+        return self.names[note_index]
+
+    def frequency_to_note(self, frequency):
+        """Version scalaire, même résultat que frequency_to_note()"""
+        if frequency <= 0:
+            return "--", 0, 0
+        note_number = 12 * (math.log2(frequency) - self.log2_reference)
+        rounded_note = round(note_number)
+        cents = 100 * (note_number - rounded_note)
+        return NOTES[(rounded_note + 9) % 12], 4 + (rounded_note + 9) // 12, cents
@@ -0,0 +1,35 @@
+"""Étapes communes du pipeline d'analyse (accordeur, processus enfant, relecture).
+
+Chaque bloc d'entrée passe par la porte d'énergie, puis par la décimation et
+la fenêtre glissante ; une trame prête n'est analysée que porte ouverte, par
+le suivi s'il est actif ou par le détecteur seul::
+
+    ready, onset = feed(block, decimator, window, gate)
+    if ready and not gated(gate, tracker):
+        estimate = analyse(window.current_frame(), detector, tracker, onset)
+"""
+
+
+def feed(block, decimator, window, gate=None):
+    """Transmet un bloc à la porte d'énergie et à la fenêtre glissante
+
+    Renvoie (nombre de trames prêtes, attaque détectée pendant le bloc).
+    """
+    onset = gate is not None and gate.update(block) and gate.onset
+    return window.push(decimator.process(block)), onset
+
+
+def gated(gate, tracker=None):
+    """Vrai si la porte est fermée ; la note suivie est alors oubliée"""
+    if gate is None or gate.active:
+        return False
+    if tracker is not None and tracker.locked is not None:
+        tracker.reset()
+    return True
+
+
+def analyse(frame, detector, tracker=None, onset=False):
+    """Estimation d'une trame : suivi incrémental s'il est actif, sinon détecteur seul"""
+    if tracker is not None:
+        return tracker.update(frame, onset)
+    return detector.detect(frame)
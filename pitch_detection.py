@@ -0,0 +1,859 @@
+"""Moteur de détection de hauteur, indépendant de Tk et de PyAudio.
+
+Chaque détecteur reçoit des trames float32 de taille fixe et renvoie un
+``PitchEstimate`` (fréquence, confiance, niveau). Les fenêtres, tables de
+fréquences, tailles de FFT et tampons de travail sont calculés une seule fois
+à la construction. Les pics spectraux sont affinés par interpolation
+parabolique pour que la fréquence ne soit pas quantifiée sur la grille des
+bins.
+
+Avec ``low_memory=True`` (cartes embarquées), les FFT réelles sont calculées
+en place, en float64, par ``scipy.fftpack`` (spectre au format « packed » :
+r0, r1, i1, r2, i2...) dans les tampons préalloués : une analyse n'alloue
+plus de tableau, au prix d'une FFT un peu plus lente que celle de
+``scipy.fft`` en float32.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+from scipy import fftpack
+from scipy.fft import rfft, irfft, rfftfreq, next_fast_len
+
+from instrumentation import NULL_STATS
+
+# Résultat d'une analyse : fréquence en Hz (0 si aucune hauteur détectée),
+# confiance entre 0 et 1 et niveau RMS de la trame
+PitchEstimate = namedtuple('PitchEstimate', ['frequency', 'confidence', 'level'])
+
+# Plage de recherche par défaut : un peu sous E2 (82 Hz) jusqu'au-delà de E6
+MIN_FREQ = 60.0
+MAX_FREQ = 1500.0
+
+
+def make_window(name, size):
+    """Construit une fenêtre d'analyse de la taille demandée"""
+    if name in (None, 'boxcar', 'rect'):
+        return np.ones(size, dtype=np.float32)
+    if name == 'hann':
+        return np.hanning(size).astype(np.float32)
+    if name == 'hamming':
+        return np.hamming(size).astype(np.float32)
+    if name == 'blackman':
+        return np.blackman(size).astype(np.float32)
+    raise ValueError(f"Fenêtre inconnue: {name}")
+
+
+class PitchDetector:
+    """Classe de base des détecteurs de hauteur
+
+    Une analyse se déroule en deux étapes chronométrées séparément :
+    ``transform`` (FFT / autocorrélation) puis ``pick`` (recherche du pic).
+    Le résultat de ``transform`` est une vue sur un tampon réutilisé.
+    """
+    name = None
+    default_window = 'hann'
+    # Instrumentation (voir instrumentation.Stats), désactivée par défaut
+    stats = NULL_STATS
+
+    def __init__(self, rate, frame_size, min_freq=MIN_FREQ, max_freq=MAX_FREQ,
+                 window=None, min_level=1e-4, low_memory=False):
+        self.rate = rate
+        self.frame_size = frame_size
+        self.min_freq = min_freq
+        self.max_freq = min(max_freq, rate / 2)
+        self.min_level = min_level
+        self.low_memory = low_memory
+        self.window = make_window(window or self.default_window, frame_size)
+
+    def allocate_fft(self, n_fft):
+        """Tampons de la FFT : trame fenêtrée complétée de zéros, amplitude
+
+        En mode low_memory, s'y ajoutent le spectre packed (calculé en place)
+        et deux tampons de travail d'une valeur par bin complexe.
+        """
+        self.padded = np.zeros(n_fft, dtype=np.float64 if self.low_memory else np.float32)
+        self.magnitude = np.zeros(n_fft // 2 + 1)
+        self.fft_window = self.window.astype(self.padded.dtype)
+        if self.low_memory:
+            self.packed = np.zeros(n_fft)
+            pairs = (n_fft - 1) // 2
+            self.pair_work = (np.zeros(pairs), np.zeros(pairs))
+
+    @staticmethod
+    def packed_rfft(x, packed):
+        """FFT réelle de x, calculée en place dans packed (format scipy.fftpack)"""
+        np.copyto(packed, x)
+        return fftpack.rfft(packed, overwrite_x=True)
+
+    def windowed(self, frame):
+        """Trame fenêtrée, écrite en tête de ``padded``"""
+        # Copie puis produit en place : pas de tampon de conversion float32 → float64
+        head = self.padded[:self.frame_size]
+        np.copyto(head, frame)
+        head *= self.fft_window
+        return head
+
+    def magnitude_spectrum(self, frame):
+        self.windowed(frame)
+        if self.low_memory:
+            return packed_magnitude(self.packed_rfft(self.padded, self.packed), self.magnitude)
+        return np.abs(rfft(self.padded), out=self.magnitude)
+
+    def level(self, frame):
+        """Niveau RMS de la trame"""
+        return float(np.sqrt(np.dot(frame, frame) / len(frame)))
+
+    def detect(self, frame):
+        """Analyse une trame et renvoie un PitchEstimate"""
+        stats = self.stats
+        level = self.level(frame)
+        if level < self.min_level:
+            return PitchEstimate(0.0, 0.0, level)
+        t0 = stats.clock()
+        transformed = self.transform(frame)
+        stats.record('fft', t0)
+        t0 = stats.clock()
+        estimate = self.pick(transformed, level)
+        stats.record('peak', t0)
+        return estimate
+
+    def transform(self, frame):
+        """Transformation de la trame (spectre, autocorrélation...)"""
+        raise NotImplementedError
+
+    def pick(self, transformed, level):
+        """Recherche de la hauteur dans le résultat de transform()"""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}(rate={self.rate}, frame_size={self.frame_size})"
+
+
+class FFTPeakDetector(PitchDetector):
+    """Pic du spectre d'amplitude (comportement historique du tuner)"""
+    name = 'fft'
+
+    def __init__(self, rate, frame_size, min_freq=0.0, max_freq=None,
+                 window=None, threshold=0.01, refine=True, min_level=0.0, **kwargs):
+        super().__init__(rate, frame_size, min_freq=min_freq, max_freq=max_freq or rate / 2,
+                         window=window, min_level=min_level, **kwargs)
+        # Seuil d'amplitude du pic (réduction du bruit)
+        self.threshold = threshold
+        self.refine = refine
+        self.bin_width = rate / frame_size
+        self.freqs = rfftfreq(frame_size, 1 / rate)
+        self.lo = int(np.searchsorted(self.freqs, self.min_freq))
+        self.hi = int(np.searchsorted(self.freqs, self.max_freq, side='right'))
+        self.allocate_fft(frame_size)
+
+    def transform(self, frame):
+        return self.magnitude_spectrum(frame)
+
+    def pick(self, magnitude, level):
+        band = magnitude[self.lo:self.hi]
+        peak = int(np.argmax(band))
+        peak_mag = band[peak]
+        if peak_mag <= self.threshold:
+            return PitchEstimate(0.0, 0.0, level)
+        power = np.dot(band, band)
+        confidence = float(peak_mag * peak_mag / power) if power > 0 else 0.0
+        index = self.lo + peak
+        if self.refine:
+            index += refine_peak(magnitude, index)
+        return PitchEstimate(float(index * self.bin_width), confidence, level)
+
+
+class HPSDetector(PitchDetector):
+    """Produit spectral harmonique (Harmonic Product Spectrum)"""
+    name = 'hps'
+
+    def __init__(self, rate, frame_size, harmonics=4, **kwargs):
+        super().__init__(rate, frame_size, **kwargs)
+        self.harmonics = harmonics
+        # Zero-padding x2 pour affiner la grille de fréquences
+        self.n_fft = next_fast_len(2 * frame_size, real=True)
+        self.bin_width = rate / self.n_fft
+        self.freqs = rfftfreq(self.n_fft, 1 / rate)
+        self.lo = max(1, int(np.searchsorted(self.freqs, self.min_freq)))
+        self.hi = int(np.searchsorted(self.freqs, self.max_freq, side='right'))
+        # Le produit ne peut dépasser le bin où la dernière harmonique sort du spectre
+        self.hi = min(self.hi, len(self.freqs) // harmonics)
+        self.allocate_fft(self.n_fft)
+        self.hps = np.zeros(self.hi)
+
+    def transform(self, frame):
+        return self.magnitude_spectrum(frame)
+
+    def pick(self, magnitude, level):
+        hps = self.hps
+        np.copyto(hps, magnitude[:self.hi])
+        for h in range(2, self.harmonics + 1):
+            hps *= magnitude[:self.hi * h:h]
+        band = hps[self.lo:self.hi]
+        total = band.sum()
+        if total <= 0:
+            return PitchEstimate(0.0, 0.0, level)
+        peak = int(np.argmax(band))
+        # L'affinage se fait sur le spectre d'origine, autour du fondamental
+        index = self.lo + peak
+        index += refine_peak(magnitude, index)
+        return PitchEstimate(float(index * self.bin_width),
+                             float(band[peak] / total), level)
+
+
+class YINDetector(PitchDetector):
+    """Algorithme YIN (de Cheveigné & Kawahara)"""
+    name = 'yin'
+    default_window = 'boxcar'
+
+    def __init__(self, rate, frame_size, threshold=0.1, **kwargs):
+        super().__init__(rate, frame_size, **kwargs)
+        self.threshold = threshold
+        self.min_tau = max(2, int(rate / self.max_freq))
+        self.max_tau = min(int(rate / self.min_freq) + 1, frame_size // 2)
+        # Fenêtre d'intégration : tout ce qui reste après le plus grand décalage
+        self.integration = frame_size - self.max_tau
+        self.n_fft = next_fast_len(frame_size + self.integration, real=True)
+        self.taus = np.arange(self.max_tau + 1)
+        self.allocate_fft(self.n_fft)
+        # Début de trame seul (w échantillons), spectre et autocorrélation
+        self.padded_head = np.zeros_like(self.padded)
+        if self.low_memory:
+            self.packed_head = np.zeros(self.n_fft)
+        # Énergie cumulée (energy[0] = 0) et tableaux indexés par tau
+        self.squares = np.zeros(frame_size)
+        self.energy = np.zeros(frame_size + 1)
+        self.diff = np.zeros(self.max_tau + 1)
+        self.cumulative = np.zeros(self.max_tau)
+        self.product = np.zeros(self.max_tau)
+        self.positive = np.zeros(self.max_tau, dtype=bool)
+        self.cmndf = np.ones(self.max_tau + 1)
+        self.below = np.zeros(self.max_tau - self.min_tau, dtype=bool)
+
+    def transform(self, frame):
+        """Différence moyenne normalisée cumulée (CMNDF)"""
+        x = self.windowed(frame)
+        w = self.integration
+        n_tau = self.max_tau + 1
+        # Autocorrélation croisée r(tau) = sum x[j] x[j+tau], j < w, via FFT
+        self.padded_head[:w] = x[:w]
+        if self.low_memory:
+            spectrum = self.packed_rfft(self.padded, self.packed)
+            head = self.packed_rfft(self.padded_head, self.packed_head)
+            packed_multiply_conj(spectrum, head, self.pair_work)
+            r = fftpack.irfft(spectrum, overwrite_x=True)[:n_tau]
+        else:
+            spectrum = rfft(self.padded) * np.conj(rfft(self.padded_head))
+            r = irfft(spectrum, self.n_fft)[:n_tau]
+        np.square(x, out=self.squares, dtype=np.float64)
+        energy = self.energy
+        # add.accumulate plutôt que cumsum, qui retient de petits objets (numpy 1.24)
+        np.add.accumulate(self.squares, out=energy[1:])
+        # diff(tau) = e(0..w) + e(tau..tau+w) - 2 r(tau)
+        diff = np.subtract(energy[w:w + n_tau], energy[:n_tau], out=self.diff)
+        diff += energy[w]
+        diff -= r
+        diff -= r
+        cmndf = self.cmndf
+        cmndf.fill(1.0)
+        cumulative = np.add.accumulate(diff[1:], out=self.cumulative)
+        np.multiply(diff[1:], self.taus[1:], out=self.product)
+        np.divide(self.product, cumulative, out=cmndf[1:],
+                  where=np.greater(cumulative, 0, out=self.positive))
+        return cmndf
+
+    def pick(self, cmndf, level):
+        search = cmndf[self.min_tau:self.max_tau]
+        below = np.less(search, self.threshold, out=self.below)
+        if below.any():
+            tau = self.min_tau + int(below.argmax())
+            # Descente jusqu'au minimum local
+            while tau + 1 < self.max_tau and cmndf[tau + 1] < cmndf[tau]:
+                tau += 1
+        else:
+            tau = self.min_tau + int(np.argmin(search))
+        shift = parabolic_offset(cmndf[tau - 1], cmndf[tau], cmndf[tau + 1])
+        confidence = max(0.0, min(1.0, 1.0 - float(cmndf[tau])))
+        return PitchEstimate(float(self.rate / (tau + shift)), confidence, level)
+
+
+class MPMDetector(PitchDetector):
+    """McLeod Pitch Method (fonction de différence au carré normalisée)"""
+    name = 'mpm'
+    default_window = 'boxcar'
+
+    def __init__(self, rate, frame_size, cutoff=0.9, **kwargs):
+        super().__init__(rate, frame_size, **kwargs)
+        self.cutoff = cutoff
+        self.min_tau = max(2, int(rate / self.max_freq))
+        self.max_tau = min(int(rate / self.min_freq) + 1, frame_size - 2)
+        self.n_fft = next_fast_len(2 * frame_size, real=True)
+        self.allocate_fft(self.n_fft)
+        self.squares = np.zeros(frame_size)
+        self.energy = np.zeros(frame_size + 1)
+        n_tau = self.max_tau + 2
+        self.norm = np.zeros(n_tau)
+        self.double = np.zeros(n_tau)
+        self.positive = np.zeros(n_tau, dtype=bool)
+        self.nsdf = np.zeros(n_tau)
+        # Zones positives de la NSDF (pick)
+        self.above = np.zeros(n_tau, dtype=bool)
+        self.changes = np.zeros(n_tau - 1, dtype=bool)
+
+    def transform(self, frame):
+        """Fonction de différence au carré normalisée (NSDF)"""
+        x = self.windowed(frame)
+        n = self.frame_size
+        n_tau = self.max_tau + 2
+        # Autocorrélation : FFT inverse du spectre de puissance
+        if self.low_memory:
+            spectrum = packed_power(self.packed_rfft(self.padded, self.packed))
+            r = fftpack.irfft(spectrum, overwrite_x=True)[:n_tau]
+        else:
+            spectrum = rfft(self.padded)
+            r = irfft(spectrum.real ** 2 + spectrum.imag ** 2, self.n_fft)[:n_tau]
+        np.square(x, out=self.squares, dtype=np.float64)
+        energy = self.energy
+        np.add.accumulate(self.squares, out=energy[1:])
+        # m(tau) = e(0..n-tau) + e(tau..n), soit energy[n - tau] + energy[n] - energy[tau]
+        m = np.add(energy[n::-1][:n_tau], energy[n], out=self.norm)
+        m -= energy[:n_tau]
+        nsdf = self.nsdf
+        nsdf.fill(0.0)
+        np.divide(np.multiply(r, 2, out=self.double), m, out=nsdf,
+                  where=np.greater(m, 0, out=self.positive))
+        return nsdf
+
+    def pick(self, nsdf, level):
+        # Maxima clés : un maximum par zone positive de la NSDF (la zone
+        # initiale, autour de tau = 0, est ignorée)
+        positive = np.greater(nsdf, 0, out=self.above)
+        changes = np.not_equal(positive[1:], positive[:-1], out=self.changes)
+        keys = []
+        start = None
+        for change in np.flatnonzero(changes):
+            index = int(change) + 1
+            if positive[index]:
+                start = index
+            elif start is not None:
+                keys.append(start + int(np.argmax(nsdf[start:index])))
+                start = None
+        if start is not None:
+            keys.append(start + int(np.argmax(nsdf[start:])))
+        keys = [tau for tau in keys if self.min_tau <= tau <= self.max_tau]
+        if not keys:
+            return PitchEstimate(0.0, 0.0, level)
+        best = max(nsdf[tau] for tau in keys)
+        tau = next(tau for tau in keys if nsdf[tau] >= self.cutoff * best)
+        shift = parabolic_offset(nsdf[tau - 1], nsdf[tau], nsdf[tau + 1])
+        confidence = max(0.0, min(1.0, float(nsdf[tau])))
+        return PitchEstimate(float(self.rate / (tau + shift)), confidence, level)
+
+
+class PolyphonicDetector(PitchDetector):
+    """Estimation simultanée de plusieurs cordes à partir d'une seule FFT
+
+    Pour chaque corde, on ne cherche que dans une bande de ±band_cents autour de
+    sa fréquence attendue et on n'accepte que les pics à moins de accept_cents.
+    Le score d'un bin est la somme pondérée (1/k) de ses harmoniques.
+
+    Les cordes sont évaluées de la plus grave à la plus aiguë. Une fois une
+    corde estimée, ses partiels d'ordre 2 et plus lui sont attribués (lobe de
+    la fenêtre, amplitude du modèle 1/k) ; une corde plus aiguë n'est retenue
+    que si au moins own_fraction du score de son pic subsiste une fois ces
+    partiels retirés. Un A2 seul ne fait donc plus apparaître de E4 fantôme
+    (3 × 110 Hz), ni un E2 seul de B3 (3 × 82 Hz).
+
+    Limite : les partiels confondus de l'accord standard (3 × E2 ≈ B3,
+    4 × E2 ≈ 3 × A2 ≈ E4) ne sont pas séparables sur une seule trame, leurs
+    amplitudes ne s'additionnant pas (phases). La fréquence d'une corde est
+    donc interpolée sur le spectre complet : quand une corde grave sonne avec
+    elle, son partiel peut encore tirer la mesure de quelques cents.
+    """
+    name = 'poly'
+    LOBE_STEPS = 32
+
+    def __init__(self, rate, frame_size, targets, band_cents=200, accept_cents=150,
+                 harmonics=3, min_salience=10.0, own_fraction=0.3, **kwargs):
+        super().__init__(rate, frame_size, **kwargs)
+        self.targets = np.asarray(targets, dtype=np.float64)
+        self.accept_cents = accept_cents
+        self.min_salience = min_salience
+        self.own_fraction = own_fraction
+        self.n_fft = next_fast_len(2 * frame_size, real=True)
+        self.bin_width = rate / self.n_fft
+        n_bins = self.n_fft // 2 + 1
+        # Bins candidats de chaque corde, tous de même largeur K
+        ratio = 2 ** (band_cents / 1200)
+        lo = np.floor(self.targets / ratio / self.bin_width).astype(int)
+        hi = np.ceil(self.targets * ratio / self.bin_width).astype(int)
+        width = int((hi - lo).max()) + 1
+        offsets = np.arange(width)
+        self.bins = np.minimum(lo[:, None] + offsets[None, :], hi[:, None])
+        # Bins des harmoniques : (H, S, K)
+        orders = np.arange(1, harmonics + 1)
+        self.harmonic_bins = np.minimum(np.rint(orders[:, None, None] * self.bins[None]).astype(int),
+                                        n_bins - 1)
+        self.weights = (1.0 / orders)[:, None, None]
+        # Les bins répétés en fin de bande (bandes plus étroites) sont ignorés
+        self.valid = lo[:, None] + offsets[None, :] <= hi[:, None]
+        # Ordre d'évaluation : de la corde la plus grave à la plus aiguë
+        self.order = np.argsort(self.targets)
+        # Zone de référence pour la saillance : toute la plage de la guitare
+        self.ref_lo = max(1, int(self.min_freq / self.bin_width))
+        self.ref_hi = int(self.max_freq / self.bin_width) + 1
+        self.allocate_fft(self.n_fft)
+        # Réponse de la fenêtre par pas de 1/LOBE_STEPS de bin, jusqu'au
+        # premier minimum (demi-largeur du lobe principal)
+        response = np.abs(rfft(self.window.astype(np.float64), self.n_fft * self.LOBE_STEPS))
+        first_minimum = int(np.argmax(np.diff(response) > 0))
+        self.response = response[:first_minimum + self.LOBE_STEPS] / response[0]
+        self.lobe = int(np.ceil(first_minimum / self.LOBE_STEPS))
+        # Lobe tabulé pour chaque décalage du partiel par rapport à son bin
+        offsets = np.arange(-self.lobe, self.lobe + 1)
+        shifts = np.arange(-self.LOBE_STEPS // 2, self.LOBE_STEPS // 2 + 1)
+        self.lobes = self.lobe_gain((offsets[None, :] * self.LOBE_STEPS - shifts[:, None])
+                                    / self.LOBE_STEPS)
+        # Partiels attribués jusqu'au dernier bin lu par le score
+        self.top_bin = int(self.harmonic_bins.max())
+        self.partial_limit = min(self.top_bin + self.lobe, n_bins - self.lobe - 2)
+        self.residual = np.zeros(n_bins)
+        self.claimed = np.zeros(n_bins)
+        self.kernel = np.zeros(2 * self.lobe + 1)
+        self.harmonic_scores = np.zeros((harmonics, width))
+        self.score = np.zeros(width)
+
+    def transform(self, frame):
+        return self.magnitude_spectrum(frame)
+
+    def detect(self, frame):
+        """Renvoie un PitchEstimate par corde cible"""
+        stats = self.stats
+        level = self.level(frame)
+        if level < self.min_level:
+            return [PitchEstimate(0.0, 0.0, level)] * len(self.targets)
+        t0 = stats.clock()
+        magnitude = self.transform(frame)
+        stats.record('fft', t0)
+        t0 = stats.clock()
+        estimates = self.pick(magnitude, level)
+        stats.record('peak', t0)
+        return estimates
+
+    def pick(self, magnitude, level):
+        residual, claimed = self.residual, self.claimed
+        claimed.fill(0.0)
+        # Saillance : score du pic rapporté à l'amplitude moyenne du spectre
+        reference = float(magnitude[self.ref_lo:self.ref_hi].mean())
+        estimates = [None] * len(self.targets)
+        for string in self.order:
+            scores = self.string_scores(magnitude, string)
+            peak = int(np.argmax(scores))
+            best = float(scores[peak])
+            salience = best / reference if reference > 0 else 0.0
+            index = int(self.bins[string, peak])
+            frequency = (index + refine_peak(magnitude, index)) * self.bin_width
+            deviation = abs(1200 * math.log2(frequency / self.targets[string]))
+            # Part du score que les partiels des cordes plus graves n'expliquent pas
+            np.subtract(magnitude, claimed, out=residual)
+            np.maximum(residual, 0.0, out=residual)
+            own = float(self.string_scores(residual, string)[peak])
+            # Un maximum proche du bord de la bande n'est que la fuite d'une corde
+            # voisine ; un score surtout fait des partiels de cordes plus graves
+            # n'est qu'un fantôme
+            if (salience < self.min_salience or deviation > self.accept_cents
+                    or own < self.own_fraction * best):
+                estimates[string] = PitchEstimate(0.0, 0.0, level)
+                continue
+            confidence = min(1.0, max(0.0, 1.0 - self.min_salience / salience))
+            estimates[string] = PitchEstimate(frequency, confidence, level)
+            if string != self.order[-1]:
+                self.claim_partials(magnitude, frequency, index)
+        return estimates
+
+    def string_scores(self, spectrum, string):
+        """Score de chaque bin candidat d'une corde : somme pondérée des harmoniques"""
+        harmonic = np.take(spectrum, self.harmonic_bins[:, string], out=self.harmonic_scores)
+        np.multiply(harmonic, self.weights[:, 0], out=harmonic)
+        scores = np.sum(harmonic, axis=0, out=self.score)
+        scores *= self.valid[string]
+        return scores
+
+    def lobe_gain(self, offset):
+        """Gain du lobe principal de la fenêtre à offset bins du partiel (0 au-delà)"""
+        index = np.rint(np.abs(offset) * self.LOBE_STEPS).astype(int)
+        return np.where(index < len(self.response),
+                        self.response[np.minimum(index, len(self.response) - 1)], 0.0)
+
+    def claim_partials(self, magnitude, frequency, peak):
+        """Attribue à une corde estimée ses partiels d'ordre 2 et plus
+
+        Chaque partiel est cherché à ±1 bin de k·f (inharmonicité) et modélisé
+        par le lobe principal de la fenêtre, à l'amplitude 1/k de la
+        fondamentale (le modèle du score) sans dépasser l'amplitude mesurée.
+        Un bin revendiqué par plusieurs cordes ne compte qu'une fois (maximum).
+        """
+        claimed, lobe, kernel = self.claimed, self.lobe, self.kernel
+        position = frequency / self.bin_width
+        amplitude = magnitude[peak] / float(self.lobe_gain(peak - position))
+        order = 2
+        while order * position < self.partial_limit:
+            expected = int(round(order * position))
+            index = expected - 1 + int(np.argmax(magnitude[expected - 1:expected + 2]))
+            shift = refine_peak(magnitude, index)
+            lobe_shape = self.lobes[int(round((shift + 0.5) * self.LOBE_STEPS))]
+            gain = min(amplitude / order, magnitude[index] / lobe_shape[lobe])
+            np.multiply(lobe_shape, gain, out=kernel)
+            part = claimed[index - lobe:index + lobe + 1]
+            np.maximum(part, kernel, out=part)
+            order += 1
+
+
+class TargetedDetector(PitchDetector):
+    """Analyse ciblée autour de la corde sélectionnée (banc de DFT / Goertzel)
+
+    La DFT n'est évaluée que sur une grille de ±span_cents autour de la
+    fréquence attendue, avec un pas de step_cents. Les bases (cosinus et sinus
+    fenêtrés) sont précalculées : une analyse se réduit à un petit produit
+    matrice × trame, bien moins coûteux qu'une FFT longue de résolution
+    équivalente. Le maximum est affiné par interpolation parabolique du log de
+    la puissance, ce qui donne une lecture au dixième de cent.
+
+    La fréquence est lue sur le fondamental seul (les harmoniques d'une corde
+    réelle sont légèrement inharmoniques). Les harmoniques 2..harmonics ne
+    sont évaluées qu'autour du maximum et servent à la confiance : la part de
+    la puissance de la trame expliquée par la série harmonique. Si elle est
+    trop faible, si le fondamental n'en porte pas au moins min_fundamental,
+    ou si le maximum est au bord de la grille (la note jouée est hors de la
+    bande), la trame est confiée au détecteur général ``fallback``.
+
+    En mode low_memory, les bases sont allouées une fois et ``set_target``
+    les recalcule en place (à n'appeler que depuis le thread d'analyse).
+    """
+    name = 'targeted'
+
+    def __init__(self, rate, frame_size, target, fallback=None, span_cents=100, step_cents=10,
+                 harmonics=3, min_confidence=0.3, min_fundamental=0.1, **kwargs):
+        super().__init__(rate, frame_size, **kwargs)
+        self.fallback = fallback
+        self.span_cents = span_cents
+        self.step_cents = step_cents
+        self.harmonics = harmonics
+        self.min_confidence = min_confidence
+        self.min_fundamental = min_fundamental
+        # Puissance de la DFT fenêtrée d'une sinusoïde de RMS 1 : 2 (sum(w) / 2)²
+        self.gain = 2 * (float(self.window.sum()) / 2) ** 2
+        self.fallbacks = 0
+        # Tampons des projections : la taille de la grille ne dépend pas de la cible
+        points = len(np.arange(-span_cents, span_cents + step_cents / 2, step_cents))
+        self.projections = np.zeros(2 * points, dtype=np.float32)
+        self.grid_power = np.zeros(points, dtype=np.float32)
+        self.harmonic_projections = np.zeros(6, dtype=np.float32)
+        self.harmonic_power = np.zeros(3, dtype=np.float32)
+        if self.low_memory:
+            # Bases (fondamental puis harmoniques) et tampons de leur calcul
+            self.grid = np.zeros(points)
+            self.order_grid = np.zeros(points)
+            self.bases = np.zeros((harmonics, 2 * points, frame_size), dtype=np.float32)
+            self.samples = np.arange(frame_size, dtype=np.float64)
+            self.cycles = np.zeros(frame_size)
+            self.phase = np.zeros(frame_size, dtype=np.float32)
+        self.set_target(target)
+
+    def basis(self, frequencies, out=None):
+        """Cosinus et sinus fenêtrés entrelacés : lignes 2k et 2k+1 pour la fréquence k"""
+        # Phase réduite à un tour en float64, puis trigonométrie en float32 (plus rapide)
+        if out is not None:
+            # Ligne par ligne : les ufuncs sur tableaux contigus n'allouent pas
+            # de tampon d'itération
+            cycles, phase = self.cycles, self.phase
+            for k, frequency in enumerate(frequencies):
+                np.multiply(self.samples, frequency / self.rate, out=cycles)
+                np.remainder(cycles, 1.0, out=cycles)
+                cycles *= 2 * np.pi
+                np.copyto(phase, cycles)
+                np.multiply(np.cos(phase, out=out[2 * k]), self.window, out=out[2 * k])
+                np.multiply(np.sin(phase, out=out[2 * k + 1]), self.window, out=out[2 * k + 1])
+            return out
+        cycles = np.outer(np.asarray(frequencies) / self.rate, np.arange(self.frame_size))
+        cycles -= np.floor(cycles)
+        phase = (2 * np.pi * cycles).astype(np.float32)
+        basis = np.empty((2 * len(frequencies), self.frame_size), dtype=np.float32)
+        basis[0::2] = np.cos(phase) * self.window
+        basis[1::2] = np.sin(phase) * self.window
+        return basis
+
+    def set_target(self, target):
+        """Reconstruit le banc pour une nouvelle corde cible
+
+        Les tables sont remplacées en une seule affectation : le thread
+        d'analyse peut continuer à appeler detect() pendant la reconstruction.
+        """
+        cents = np.arange(-self.span_cents, self.span_cents + self.step_cents / 2, self.step_cents)
+        if self.low_memory:
+            grid = self.grid
+            np.multiply(target, np.exp2(cents / 1200), out=grid)
+            orders = [order for order in range(2, self.harmonics + 1)
+                      if order * grid[-1] < self.rate / 2]
+            for order, basis in zip([1] + orders, self.bases):
+                self.basis(np.multiply(grid, order, out=self.order_grid), out=basis)
+            self.bank = (float(target), grid, self.bases[0], list(self.bases[1:1 + len(orders)]))
+            return
+        grid = target * 2 ** (cents / 1200)
+        # Harmoniques au-delà de Nyquist ignorées
+        harmonics = [self.basis(order * grid) for order in range(2, self.harmonics + 1)
+                     if order * grid[-1] < self.rate / 2]
+        self.bank = (float(target), grid, self.basis(grid), harmonics)
+
+    @property
+    def target(self):
+        return self.bank[0]
+
+    def detect(self, frame):
+        stats = self.stats
+        level = self.level(frame)
+        if level < self.min_level:
+            return PitchEstimate(0.0, 0.0, level)
+        bank = self.bank
+        t0 = stats.clock()
+        power = self.transform(frame, bank)
+        stats.record('fft', t0)
+        t0 = stats.clock()
+        estimate = self.pick(power, level, frame, bank)
+        stats.record('peak', t0)
+        if estimate.frequency <= 0 and self.fallback is not None:
+            self.fallbacks += 1
+            stats.count('targeted_fallbacks')
+            return self.fallback.detect(frame)
+        return estimate
+
+    @staticmethod
+    def power(basis, frame, projections, out):
+        """cos² + sin² des projections de la trame, écrit dans out"""
+        np.matmul(basis, frame, out=projections)
+        np.square(projections, out=projections)
+        return np.add(projections[0::2], projections[1::2], out=out)
+
+    def transform(self, frame, bank=None):
+        """Puissance du fondamental en chaque point de la grille"""
+        return self.power((bank or self.bank)[2], frame, self.projections, self.grid_power)
+
+    def pick(self, power, level, frame, bank=None):
+        _, grid, _, harmonics = bank or self.bank
+        peak = int(np.argmax(power))
+        # Maximum au bord : la note jouée est hors de la bande ciblée
+        if peak == 0 or peak == len(power) - 1:
+            return PitchEstimate(0.0, 0.0, level)
+        fundamental = explained = float(power[peak])
+        for basis in harmonics:
+            # Seules les lignes des trois points autour du maximum (vue, sans copie)
+            explained += float(self.power(basis[2 * peak - 2:2 * peak + 4], frame,
+                                          self.harmonic_projections, self.harmonic_power).max())
+        confidence = explained / (self.gain * level * level)
+        if confidence < self.min_confidence or fundamental < self.min_fundamental * explained:
+            return PitchEstimate(0.0, 0.0, level)
+        shift = refine_peak(power, peak)
+        # Grille géométrique : l'interpolation se fait en cents
+        frequency = grid[peak] * 2 ** (shift * self.step_cents / 1200)
+        return PitchEstimate(float(frequency), min(confidence, 1.0), level)
+
+
+class EnergyGate:
+    """Porte d'énergie : l'analyse spectrale ne tourne que d'une attaque à l'extinction
+
+    Le RMS est mesuré sur des fenêtres de durée fixe (``rms_time``, coût
+    négligeable devant une FFT), quelle que soit la taille des blocs reçus :
+    un bloc de 128 échantillons est plus court qu'une période de E2 et son RMS
+    suivrait la phase de l'onde. Porte fermée, le plancher de bruit suit le
+    niveau ambiant. Porte ouverte, il reste figé tant que le niveau décroît
+    (extinction de la note) ; un niveau stable pendant ``steady_time``
+    secondes (bruit de fond devenu durablement plus fort) le fait monter
+    lentement, sans le dépasser, ce qui referme la porte. Une attaque est
+    détectée quand le RMS dépasse le plancher de ``onset_ratio`` (et aussi
+    quand il bondit de ce rapport d'une mesure à la suivante, porte ouverte,
+    pour repérer une corde repincée). La porte se referme après ``hold_time``
+    secondes sous ``release_ratio`` fois le plancher ou sous
+    ``release_fraction`` du niveau maximal de la note.
+
+    Les durées sont en secondes et converties en mesures pour la fréquence
+    d'entrée (``configure`` après une renégociation).
+    """
+
+    def __init__(self, rate, onset_ratio=4.0, release_ratio=2.0, release_fraction=0.02,
+                 hold_time=0.1, min_level=1e-5, floor_time=0.25, steady_time=2.0,
+                 steady_ratio=1.5, rms_time=0.015):
+        self.onset_ratio = onset_ratio
+        self.release_ratio = release_ratio
+        self.release_fraction = release_fraction
+        self.hold_time = hold_time
+        self.min_level = min_level
+        # Constante de temps de la montée du plancher
+        self.floor_time = floor_time
+        # Niveau « stable » porte ouverte : RMS dans un rapport steady_ratio
+        self.steady_time = steady_time
+        self.steady_ratio = steady_ratio
+        self.rms_time = rms_time
+        self.configure(rate)
+        self.noise_floor = None
+        self.active = False
+        # Vrai si une attaque a été détectée pendant le dernier bloc reçu
+        self.onset = False
+        self.previous_rms = 0.0
+        self.peak_rms = 0.0
+        self.quiet_windows = 0
+        # Plage de RMS du segment stable en cours (porte ouverte)
+        self.steady_low = self.steady_high = 0.0
+        self.steady_count = 0
+        self.windows = 0
+        self.active_windows = 0
+        self.onsets = 0
+
+    def configure(self, rate):
+        """Convertit les durées en nombres de mesures et en coefficient par mesure"""
+        self.rms_size = max(1, round(self.rms_time * rate))
+        window_time = self.rms_size / rate
+        self.hold_windows = max(1, round(self.hold_time / window_time))
+        self.floor_decay = 1.0 - math.exp(-window_time / self.floor_time)
+        self.steady_windows = max(1, round(self.steady_time / window_time))
+        # Mesure en cours : énergie et nombre d'échantillons accumulés
+        self.energy = 0.0
+        self.pending = 0
+
+    def update(self, block):
+        """Met à jour la porte avec un nouveau bloc ; renvoie True si elle est ouverte"""
+        onset = False
+        start = 0
+        while start < len(block):
+            part = block[start:start + self.rms_size - self.pending]
+            self.energy += float(np.dot(part, part))
+            self.pending += len(part)
+            start += len(part)
+            if self.pending == self.rms_size:
+                self.measure(math.sqrt(self.energy / self.rms_size))
+                onset = onset or self.onset
+                self.energy = 0.0
+                self.pending = 0
+        self.onset = onset
+        return self.active
+
+    def measure(self, rms):
+        """Une mesure de RMS sur rms_size échantillons"""
+        self.windows += 1
+        self.onset = False
+        if self.noise_floor is None:
+            # Première mesure : calibration du plancher, pas d'attaque possible
+            self.noise_floor = max(rms, self.min_level)
+            self.previous_rms = rms
+            return
+        threshold = max(self.noise_floor, self.min_level)
+        self.onset = (rms > threshold * self.onset_ratio and
+                      (not self.active or rms > self.previous_rms * self.onset_ratio))
+        if self.onset:
+            self.active = True
+            self.onsets += 1
+            self.quiet_windows = 0
+            self.peak_rms = rms
+        elif self.active:
+            self.peak_rms = max(self.peak_rms, rms)
+            if rms < max(threshold * self.release_ratio, self.peak_rms * self.release_fraction):
+                self.quiet_windows += 1
+                if self.quiet_windows >= self.hold_windows:
+                    self.active = False
+            else:
+                self.quiet_windows = 0
+        if not self.active:
+            # Suivi du bruit ambiant : descente immédiate, montée lente
+            if rms < self.noise_floor:
+                self.noise_floor = max(rms, self.min_level)
+            else:
+                self.noise_floor += self.floor_decay * (rms - self.noise_floor)
+        else:
+            self.active_windows += 1
+            self.track_steady_level(rms)
+        self.previous_rms = rms
+
+    def track_steady_level(self, rms):
+        """Porte ouverte : montée bornée du plancher vers un niveau resté stable"""
+        if (self.onset or rms > self.steady_low * self.steady_ratio
+                or rms * self.steady_ratio < self.steady_high):
+            # Attaque, ou niveau sorti de la plage : nouveau segment
+            self.steady_low = self.steady_high = rms
+            self.steady_count = 0
+            return
+        self.steady_low = min(self.steady_low, rms)
+        self.steady_high = max(self.steady_high, rms)
+        self.steady_count += 1
+        if self.steady_count >= self.steady_windows and self.steady_low > self.noise_floor:
+            self.noise_floor += self.floor_decay * (self.steady_low - self.noise_floor)
+
+
+def parabolic_offset(left, center, right):
+    """Décalage (en échantillons/bins) du sommet de la parabole passant par trois points"""
+    denominator = left - 2 * center + right
+    if denominator == 0:
+        return 0.0
+    return max(-0.5, min(0.5, float(0.5 * (left - right) / denominator)))
+
+
+def refine_peak(magnitude, index):
+    """Position fractionnaire d'un pic spectral (interpolation parabolique du log)"""
+    if index <= 0 or index >= len(magnitude) - 1:
+        return 0.0
+    left, center, right = np.log(magnitude[index - 1:index + 2] + 1e-12)
+    return parabolic_offset(left, center, right)
+
+
+def packed_pairs(packed):
+    """Vues (parties réelles, parties imaginaires) des bins complexes d'un spectre packed"""
+    pairs = (len(packed) - 1) // 2
+    return packed[1:2 * pairs:2], packed[2:2 * pairs + 1:2]
+
+
+def packed_magnitude(packed, out):
+    """Amplitude d'un spectre packed, écrite dans out (n // 2 + 1 bins)"""
+    real, imag = packed_pairs(packed)
+    out[0] = abs(packed[0])
+    np.hypot(real, imag, out=out[1:len(real) + 1])
+    # Taille paire : le bin de Nyquist (réel) est le dernier élément
+    if len(packed) % 2 == 0:
+        out[-1] = abs(packed[-1])
+    return out
+
+
+def packed_multiply_conj(a, b, work):
+    """a *= conj(b), en place, pour deux spectres packed (work : deux tampons par bin)"""
+    a_real, a_imag = packed_pairs(a)
+    b_real, b_imag = packed_pairs(b)
+    real, imag = work
+    np.multiply(a_real, b_real, out=real)
+    real += np.multiply(a_imag, b_imag, out=imag)
+    np.multiply(a_imag, b_real, out=imag)
+    imag -= np.multiply(a_real, b_imag, out=a_real)
+    np.copyto(a_real, real)
+    np.copyto(a_imag, imag)
+    a[0] *= b[0]
+    if len(a) % 2 == 0:
+        a[-1] *= b[-1]
+    return a
+
+
+def packed_power(packed):
+    """Spectre de puissance |X|², en place (parties imaginaires mises à zéro)"""
+    np.square(packed, out=packed)
+    real, imag = packed_pairs(packed)
+    real += imag
+    imag.fill(0.0)
+    return packed
+
+
+DETECTORS = {cls.name: cls for cls in (FFTPeakDetector, HPSDetector, YINDetector, MPMDetector)}
+
+
+def create_detector(name, rate, frame_size, **kwargs):
+    """Instancie un détecteur à partir de son nom ('fft', 'hps', 'yin', 'mpm')"""
+    try:
+        cls = DETECTORS[name]
+    except KeyError:
+        raise ValueError(f"Détecteur inconnu: {name} (choix: {', '.join(DETECTORS)})") from None
+    return cls(rate, frame_size, **kwargs)
@@ -0,0 +1,159 @@
+"""Diffusion locale des estimations de hauteur (JSON lines sur TCP ou socket Unix).
+
+Le serveur tourne dans sa propre boucle asyncio, dans un thread dédié. Le
+thread d'analyse appelle ``publish()`` qui ne bloque jamais : seule la
+dernière estimation est conservée, pour le serveur comme pour chaque client.
+Un client lent ne reçoit donc que l'estimation la plus récente au moment où
+il est prêt, et la mémoire reste bornée quel que soit le nombre d'abonnés.
+
+    python -c "import socket; s = socket.create_connection(('127.0.0.1', 8765)); print(s.makefile().readline())"
+"""
+import asyncio
+import json
+import threading
+
+
+class _Client:
+    """État d'un abonné : un seul message en attente au maximum"""
+    __slots__ = ('writer', 'pending', 'ready', 'sent', 'dropped')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.pending = None
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+
+
+class PitchServer:
+    """Serveur de diffusion des estimations vers de nombreux abonnés"""
+
+    def __init__(self, host='127.0.0.1', port=8765, path=None, max_clients=1024):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.max_clients = max_clients
+        self.clients = set()
+        self.loop = None
+        self.thread = None
+        self.server = None
+        self.started = threading.Event()
+        # Dernière estimation publiée et envoi déjà programmé dans la boucle
+        self.latest = None
+        self.broadcast_payload = None
+        self.scheduled = False
+        self.dropped = 0
+        self.rejected = 0
+
+    def start(self):
+        """Démarre la boucle asyncio dans un thread dédié"""
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.started.wait(timeout=5.0)
+        where = self.path or f"{self.host}:{self.port}"
+        print(f"Diffusion des estimations sur {where}")
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._listen())
+        except OSError as e:
+            print(f"Impossible de démarrer le serveur de diffusion: {e}")
+            self.started.set()
+            return
+        self.started.set()
+        self.loop.run_forever()
+        # Arrêt : fermeture du serveur et des connexions restantes
+        self.server.close()
+        for client in list(self.clients):
+            client.writer.close()
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+
+    async def _listen(self):
+        if self.path:
+            self.server = await asyncio.start_unix_server(self._handle, path=self.path)
+        else:
+            self.server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def _handle(self, reader, writer):
+        if len(self.clients) >= self.max_clients:
+            self.rejected += 1
+            writer.close()
+            return
+        # Limite basse du tampon d'émission : un client lent est vite considéré en retard
+        writer.transport.set_write_buffer_limits(high=16384)
+        client = _Client(writer)
+        self.clients.add(client)
+        sender = asyncio.ensure_future(self._send_loop(client))
+        try:
+            # Les abonnés n'envoient rien : on attend seulement la déconnexion
+            while await reader.read(1024):
+                pass
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            sender.cancel()
+            self.clients.discard(client)
+            self.dropped += client.dropped
+            writer.close()
+
+    async def _send_loop(self, client):
+        try:
+            while True:
+                await client.ready.wait()
+                client.ready.clear()
+                payload, client.pending = client.pending, None
+                client.writer.write(payload)
+                client.sent += 1
+                await client.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+    def _broadcast(self):
+        """Exécuté dans la boucle asyncio : remplace le message en attente de chaque client"""
+        self.scheduled = False
+        payload = self.latest
+        if payload is self.broadcast_payload:
+            return
+        self.broadcast_payload = payload
+        for client in self.clients:
+            if client.pending is not None:
+                client.dropped += 1
+            client.pending = payload
+            client.ready.set()
+
+    @property
+    def active(self):
+        """Vrai si au moins un abonné est connecté (évite de préparer des messages inutiles)"""
+        return bool(self.clients)
+
+    def publish(self, event):
+        """Publie une estimation (appelé depuis le thread d'analyse, jamais bloquant)"""
+        if not self.clients or self.loop is None:
+            return
+        self.latest = (json.dumps(event, separators=(',', ':')) + '\n').encode()
+        if not self.scheduled:
+            self.scheduled = True
+            try:
+                self.loop.call_soon_threadsafe(self._broadcast)
+            except RuntimeError:
+                # Boucle déjà fermée (arrêt en cours)
+                pass
+
+    def stats(self):
+        return {
+            'subscribers': len(self.clients),
+            'subscriber_drops': self.dropped + sum(client.dropped for client in list(self.clients)),
+            'subscribers_rejected': self.rejected,
+        }
+
+    def stop(self):
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=1.0)
+        self.clients.clear()
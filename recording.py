@@ -0,0 +1,270 @@
+"""Enregistrement brut de l'entrée audio et relecture déterministe.
+
+L'enregistreur écrit les blocs float32 reçus par le pipeline, avec leur
+horodatage, dans un fichier anneau projeté en mémoire (memmap) de taille
+fixe : une fois plein, les blocs les plus anciens sont écrasés. Le fichier
+contient un en-tête, puis les longueurs, les horodatages et les données::
+
+    en-tête (64 octets) | longueurs int32[N] | horodatages float64[N] | blocs float32[N, B]
+
+``ReplaySource`` relit un tel fichier à la place du flux PyAudio, en temps
+réel (en respectant les écarts entre horodatages) ou plus vite, et la
+commande ci-dessous compare les détecteurs sur une prise réelle::
+
+    python guitar_tuner.py --record prise.ring
+    python guitar_tuner.py --replay prise.ring
+    python recording.py prise.ring --detectors fft yin mpm
+"""
+import argparse
+import struct
+import sys
+import time
+
+import numpy as np
+
+from audio_buffer import SlidingWindow
+from decimation import ANALYSIS_RATE, Decimator, analysis_config
+import pipeline
+from pitch_detection import DETECTORS, EnergyGate, create_detector
+from tracking import PitchTracker
+
+MAGIC = b'GTRING01'
+# Signature, fréquence, taille de bloc, capacité (blocs), blocs écrits depuis le début
+HEADER = struct.Struct('<8sIIQQ')
+HEADER_SIZE = 64
+
+
+def layout(capacity, block_size):
+    """Positions (longueurs, horodatages, données) et taille totale du fichier"""
+    lengths = HEADER_SIZE
+    # Alignement sur 8 octets pour les horodatages float64
+    timestamps = lengths + (capacity * 4 + 7) // 8 * 8
+    data = timestamps + capacity * 8
+    return lengths, timestamps, data, data + capacity * block_size * 4
+
+
+class RingFile:
+    """Vues NumPy sur un fichier anneau projeté en mémoire"""
+
+    def __init__(self, path, mode='r', rate=None, block_size=None, capacity=None):
+        self.path = path
+        if mode == 'r':
+            with open(path, 'rb') as f:
+                magic, rate, block_size, capacity, _ = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path}: ce n'est pas un enregistrement du tuner")
+        self.rate = rate
+        self.block_size = block_size
+        self.capacity = capacity
+        lengths, timestamps, data, size = layout(capacity, block_size)
+        self.buffer = np.memmap(path, dtype=np.uint8, mode=mode, shape=(size,))
+        self.counter = self.buffer[HEADER.size - 8:HEADER.size].view(np.uint64)
+        self.lengths = self.buffer[lengths:timestamps].view(np.int32)[:capacity]
+        self.timestamps = self.buffer[timestamps:data].view(np.float64)
+        self.data = self.buffer[data:size].view(np.float32).reshape(capacity, block_size)
+        if mode == 'w+':
+            self.buffer[:HEADER.size] = np.frombuffer(
+                HEADER.pack(MAGIC, rate, block_size, capacity, 0), dtype=np.uint8)
+
+    @property
+    def written(self):
+        """Nombre de blocs écrits depuis le début (y compris ceux écrasés)"""
+        return int(self.counter[0])
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    def slots(self):
+        """Index des blocs conservés, du plus ancien au plus récent"""
+        written = self.written
+        start = max(0, written - self.capacity)
+        return [i % self.capacity for i in range(start, written)]
+
+    def block(self, slot):
+        """Bloc ``slot`` (vue sur le fichier, sans copie)"""
+        return self.data[slot, :self.lengths[slot]]
+
+    def close(self):
+        self.buffer.flush()
+        del self.buffer
+
+
+class Recorder:
+    """Enregistre les blocs reçus dans un fichier anneau de taille bornée
+
+    ``max_seconds`` fixe la durée conservée (les blocs plus anciens sont
+    écrasés). Les blocs plus longs que ``block_size`` sont découpés.
+
+    Les horodatages suivent l'horloge des échantillons (heure du premier bloc
+    plus échantillons reçus / fréquence) : la file de capture est vidée par
+    rafales et l'heure de l'appel ne dit pas quand l'audio a été capté.
+    """
+
+    def __init__(self, path, rate, block_size, max_seconds=60.0):
+        capacity = max(1, int(np.ceil(max_seconds * rate / block_size)))
+        self.ring = RingFile(path, 'w+', rate, block_size, capacity)
+        self.block_size = block_size
+        self.rate = rate
+        self.started = None
+        self.samples = 0
+
+    def append(self, block, timestamp=None):
+        """Ajoute un bloc (appelé depuis le thread d'analyse)"""
+        ring = self.ring
+        if timestamp is None:
+            if self.started is None:
+                self.started = time.time()
+            timestamp = self.started + self.samples / self.rate
+        for start in range(0, len(block), self.block_size):
+            part = block[start:start + self.block_size]
+            slot = ring.written % ring.capacity
+            ring.data[slot, :len(part)] = part
+            ring.lengths[slot] = len(part)
+            ring.timestamps[slot] = timestamp + start / self.rate
+            # Compteur mis à jour en dernier : un lecteur ne voit que des blocs complets
+            ring.counter[0] += 1
+        self.samples += len(block)
+
+    def close(self):
+        self.ring.close()
+
+
+class ReplaySource:
+    """Relit un enregistrement à la place d'un flux PyAudio en mode bloquant
+
+    ``speed`` vaut 1.0 pour le temps réel, 2.0 pour deux fois plus vite, et 0
+    pour enchaîner les blocs sans attendre. ``read`` renvoie les blocs tels
+    qu'ils ont été reçus à l'enregistrement (mêmes frontières), quelle que soit
+    la taille demandée. En fin de fichier, ``read`` renvoie des octets vides
+    (ou recommence au début avec ``loop``).
+    """
+
+    def __init__(self, path, speed=1.0, loop=False):
+        self.ring = RingFile(path)
+        self.rate = self.ring.rate
+        self.speed = speed
+        self.loop = loop
+        self.order = self.ring.slots()
+        self.finished = False
+        self.rewind()
+
+    def rewind(self):
+        self.position = 0
+        self.started = None
+
+    def __len__(self):
+        return len(self.order)
+
+    def blocks(self):
+        """Itère sur (horodatage, bloc) sans attendre"""
+        for slot in self.order:
+            yield float(self.ring.timestamps[slot]), self.ring.block(slot)
+
+    def read_block(self):
+        """Bloc suivant (vue float32), après l'attente imposée par ``speed``"""
+        if self.position >= len(self.order):
+            if not self.loop or not self.order:
+                if not self.finished:
+                    self.finished = True
+                    print("Fin de la relecture")
+                time.sleep(0.1)
+                return self.ring.data[0, :0]
+            self.rewind()
+        slot = self.order[self.position]
+        self.position += 1
+        if self.speed > 0:
+            timestamp = float(self.ring.timestamps[slot])
+            if self.started is None:
+                self.started = (time.perf_counter(), timestamp)
+            due = self.started[0] + (timestamp - self.started[1]) / self.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return self.ring.block(slot)
+
+    def read(self, num_frames=None, exception_on_overflow=False):
+        """Compatibilité avec pyaudio.Stream.read"""
+        return self.read_block().tobytes()
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def replay_detector(source, name, window_size, hop_size, gate=True, track=True,
+                    analysis_rate=ANALYSIS_RATE):
+    """Analyse une relecture complète ; renvoie débit, taux de détection et stabilité
+
+    Même chemin que l'accordeur (voir pipeline.py) : porte d'énergie,
+    décimation, fenêtre glissante et suivi, avec les blocs tels qu'enregistrés.
+    """
+    factor, rate, window_size, hop_size = analysis_config(source.rate, window_size, hop_size,
+                                                          analysis_rate)
+    decimator = Decimator(factor)
+    window = SlidingWindow(window_size, hop_size)
+    energy_gate = EnergyGate(source.rate) if gate else None
+    detector = create_detector(name, rate, window_size)
+    tracker = PitchTracker(rate, window_size, detector) if track else None
+    frequencies = []
+    gated_frames = 0
+    elapsed = 0
+    onset = False
+    for _, block in source.blocks():
+        ready, block_onset = pipeline.feed(block, decimator, window, energy_gate)
+        onset = onset or block_onset
+        if not ready:
+            continue
+        if pipeline.gated(energy_gate, tracker):
+            gated_frames += 1
+            continue
+        frame = window.current_frame()
+        t0 = time.perf_counter_ns()
+        estimate = pipeline.analyse(frame, detector, tracker, onset)
+        elapsed += time.perf_counter_ns() - t0
+        onset = False
+        frequencies.append(estimate.frequency)
+    frequencies = np.array(frequencies)
+    detected = frequencies[frequencies > 0]
+    # Instabilité : écart entre deux estimations consécutives (même note)
+    jumps = np.abs(1200 * np.log2(detected[1:] / detected[:-1])) if len(detected) > 1 else np.zeros(0)
+    steady = jumps[jumps < 50]
+    return {
+        'frames': len(frequencies),
+        'gated_frames': gated_frames,
+        'frames_per_sec': round(len(frequencies) / (elapsed / 1e9), 1) if elapsed else 0.0,
+        'detection_rate': round(len(detected) / len(frequencies), 4) if len(frequencies) else 0.0,
+        'jump_rate': round(1 - len(steady) / len(jumps), 4) if len(jumps) else 0.0,
+        'median_jitter_cents': round(float(np.median(steady)), 3) if len(steady) else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare les détecteurs sur un enregistrement brut")
+    parser.add_argument('recording', help="fichier produit par guitar_tuner.py --record")
+    parser.add_argument('--detectors', nargs='+', choices=sorted(DETECTORS), default=sorted(DETECTORS))
+    parser.add_argument('--window', type=int, default=8192)
+    parser.add_argument('--hop', type=int, default=512)
+    parser.add_argument('--analysis-rate', type=int, default=ANALYSIS_RATE)
+    parser.add_argument('--no-gate', dest='gate', action='store_false',
+                        help="analyse aussi les silences, comme guitar_tuner.py --no-gate")
+    parser.add_argument('--no-track', dest='track', action='store_false',
+                        help="détecteur seul, sans suivi, comme guitar_tuner.py --no-track")
+    args = parser.parse_args(argv)
+
+    source = ReplaySource(args.recording, speed=0)
+    duration = sum(len(block) for _, block in source.blocks()) / source.rate
+    print(f"{args.recording}: {len(source)} blocs, {duration:.1f} s à {source.rate} Hz")
+    print(f"{'détecteur':<10}{'trames/s':>10}{'détection':>11}{'sauts':>8}{'gigue cents':>13}")
+    for name in args.detectors:
+        result = replay_detector(source, name, args.window, args.hop, gate=args.gate,
+                                 track=args.track, analysis_rate=args.analysis_rate)
+        jitter = result['median_jitter_cents']
+        print(f"{name:<10}{result['frames_per_sec']:>10.0f}{result['detection_rate']:>11.1%}"
+              f"{result['jump_rate']:>8.1%}{'--' if jitter is None else f'{jitter:.2f}':>13}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
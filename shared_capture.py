@@ -0,0 +1,267 @@
+"""Capture et analyse dans un processus séparé, résultats en mémoire partagée.
+
+Le processus enfant ouvre le périphérique, remplit la fenêtre glissante et
+lance la détection : la FFT et les boucles Python ne disputent plus le GIL à
+Tk. Il écrit dans un bloc ``multiprocessing.shared_memory`` découpé en vues
+NumPy :
+
+    contrôle int64[8]      numéros de séquence, arrêt, compteurs
+    paramètres float64[8]  réglages modifiés à chaud par l'interface
+    résultats float64[S, 4] anneau (fréquence, confiance, niveau, horodatage)
+    trames float32[2, W]   double tampon de la dernière fenêtre analysée
+
+Chaque écriture remplit d'abord l'emplacement, puis incrémente le numéro de
+séquence. L'interface lit le dernier emplacement publié, sans copie ni
+sérialisation (aucun pickle sur le chemin critique), et vérifie que le
+numéro n'a pas fait le tour de l'anneau pendant sa lecture. Seules les
+erreurs, rares, remontent par une file.
+"""
+import gc
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from audio_buffer import FrameQueue, SlidingWindow
+from decimation import ANALYSIS_RATE, Decimator, analysis_config
+import pipeline
+from pitch_detection import EnergyGate, PitchEstimate, TargetedDetector, create_detector
+from tracking import PitchTracker
+
+# Bloc de contrôle
+RESULT_SEQ, FRAME_SEQ, STOP, ANALYSED, GATED, OVERRUNS, ONSETS = range(7)
+# Paramètres : fréquence de la corde ciblée et mode zoom (0 ou 1) ; jauge
+# publiée par l'enfant : plancher de bruit de la porte d'énergie
+TARGET, TARGETED, NOISE_FLOOR = range(3)
+RESULT_FIELDS = 4
+
+
+class SharedState:
+    """Vues NumPy sur le bloc de mémoire partagée
+
+    Sans ``name``, le bloc est créé (et sera supprimé par ``close``) ;
+    sinon on s'attache au bloc existant.
+    """
+
+    def __init__(self, window_size, slots=8, name=None):
+        self.window_size = window_size
+        self.slots = slots
+        results = 128
+        frames = results + slots * RESULT_FIELDS * 8
+        size = frames + 2 * window_size * 4
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # L'enfant (lancé par multiprocessing) partage le suivi des ressources
+            # du parent : le bloc n'est supprimé qu'au unlink() du créateur
+            self.shm = shared_memory.SharedMemory(name=name)
+        buf = self.shm.buf
+        self.control = np.ndarray((8,), dtype=np.int64, buffer=buf, offset=0)
+        self.params = np.ndarray((8,), dtype=np.float64, buffer=buf, offset=64)
+        self.results = np.ndarray((slots, RESULT_FIELDS), dtype=np.float64, buffer=buf, offset=results)
+        self.frames = np.ndarray((2, window_size), dtype=np.float32, buffer=buf, offset=frames)
+        if self.owner:
+            self.control[:] = 0
+            self.params[:] = 0.0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish_result(self, estimate, timestamp):
+        seq = int(self.control[RESULT_SEQ])
+        self.results[seq % self.slots] = (estimate.frequency, estimate.confidence,
+                                          estimate.level, timestamp)
+        self.control[RESULT_SEQ] = seq + 1
+
+    def latest_result(self):
+        """(numéro, PitchEstimate, horodatage) du dernier résultat ; (0, None, 0.0) avant le premier"""
+        while True:
+            seq = int(self.control[RESULT_SEQ])
+            if seq == 0:
+                return 0, None, 0.0
+            frequency, confidence, level, timestamp = self.results[(seq - 1) % self.slots]
+            # Emplacement réécrit pendant la lecture : on relit le plus récent
+            if int(self.control[RESULT_SEQ]) - seq < self.slots - 1:
+                return (seq, PitchEstimate(float(frequency), float(confidence), float(level)),
+                        float(timestamp))
+
+    def publish_frame(self, frame):
+        seq = int(self.control[FRAME_SEQ])
+        self.frames[seq % 2] = frame
+        self.control[FRAME_SEQ] = seq + 1
+
+    def latest_frame(self):
+        """(numéro, vue sur la dernière fenêtre analysée)"""
+        seq = int(self.control[FRAME_SEQ])
+        return seq, self.frames[(seq - 1) % 2]
+
+    def close(self):
+        # Les vues doivent être libérées avant de fermer le bloc
+        self.control = self.params = self.results = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def capture_process(name, errors, device_index, rate, chunk, window_size, hop_size,
+                    detector, track, gate, slots, analysis_rate=ANALYSIS_RATE, low_memory=False):
+    """Processus enfant : capture, porte d'énergie, décimation, détection et publication
+
+    ``window_size`` et ``hop_size`` sont déjà exprimés à la fréquence d'analyse.
+    """
+    import pyaudio
+
+    factor, analysis_rate, _, _ = analysis_config(rate, window_size, hop_size, analysis_rate)
+    state = SharedState(window_size, slots, name=name)
+    p = pyaudio.PyAudio()
+    stream = None
+    frame_queue = FrameQueue(64, chunk)
+
+    def callback(in_data, frame_count, time_info, status):
+        frame_queue.push(np.frombuffer(in_data, dtype=np.float32))
+        return (None, pyaudio.paContinue)
+
+    try:
+        general = create_detector(detector, analysis_rate, window_size, low_memory=low_memory)
+        targeted = TargetedDetector(analysis_rate, window_size, 82.41, fallback=general)
+        tracker = (PitchTracker(analysis_rate, window_size, general, low_memory=low_memory)
+                   if track else None)
+        energy_gate = EnergyGate(rate) if gate else None
+        decimator = Decimator(factor)
+        window = SlidingWindow(window_size, hop_size)
+        block = np.zeros(chunk, dtype=np.float32)
+        stream = p.open(format=pyaudio.paFloat32, channels=1, rate=rate, input=True,
+                        input_device_index=device_index, frames_per_buffer=chunk,
+                        stream_callback=callback)
+        if low_memory:
+            # Objets de démarrage soustraits au ramasse-miettes (passes courtes)
+            gc.collect()
+            gc.freeze()
+        onset = False
+        while not state.control[STOP]:
+            n = frame_queue.pop(block, timeout=0.1)
+            if not n:
+                continue
+            ready = 0
+            while n:
+                frames, block_onset = pipeline.feed(block[:n], decimator, window, energy_gate)
+                ready += frames
+                onset = onset or block_onset
+                n = frame_queue.pop(block)
+            state.control[OVERRUNS] = frame_queue.overruns
+            if energy_gate is not None:
+                state.control[ONSETS] = energy_gate.onsets
+                state.params[NOISE_FLOOR] = energy_gate.noise_floor or 0.0
+            if not ready:
+                continue
+            if pipeline.gated(energy_gate, tracker):
+                state.control[GATED] += 1
+                continue
+
+            # Réglages de l'interface : corde ciblée et mode zoom
+            detector_in_use = general
+            if state.params[TARGETED]:
+                target = float(state.params[TARGET])
+                if target > 0 and target != targeted.target:
+                    targeted.set_target(target)
+                detector_in_use = targeted
+            frame = window.current_frame()
+            state.publish_frame(frame)
+            if tracker is not None and tracker.detector is not detector_in_use:
+                tracker.detector = detector_in_use
+                tracker.reset()
+            estimate = pipeline.analyse(frame, detector_in_use, tracker, onset)
+            onset = False
+            state.control[ANALYSED] += 1
+            if estimate.frequency > 0:
+                state.publish_result(estimate, time.time())
+    except Exception as e:
+        errors.put(str(e))
+    finally:
+        if stream is not None:
+            stream.stop_stream()
+            stream.close()
+        p.terminate()
+        state.close()
+
+
+class SharedCapture:
+    """Côté interface : démarre le processus enfant et lit ses résultats
+
+    Offre aussi ``stop_stream`` / ``close`` pour remplacer un flux PyAudio.
+    """
+
+    def __init__(self, device_index, rate, chunk, window_size, hop_size, detector='fft',
+                 track=True, gate=True, slots=8, analysis_rate=ANALYSIS_RATE, low_memory=False):
+        # Tailles données à 44.1 kHz, converties à la fréquence d'analyse
+        _, _, window_size, hop_size = analysis_config(rate, window_size, hop_size, analysis_rate)
+        self.state = SharedState(window_size, slots)
+        self.gate = gate
+        context = mp.get_context('spawn')
+        self.errors = context.Queue()
+        self.process = context.Process(
+            target=capture_process,
+            args=(self.state.name, self.errors, device_index, rate, chunk, window_size,
+                  hop_size, detector, track, gate, slots, analysis_rate, low_memory),
+            daemon=True)
+
+    def start(self):
+        self.process.start()
+        return self
+
+    def set_target(self, frequency, targeted):
+        self.state.params[TARGET] = frequency
+        self.state.params[TARGETED] = 1.0 if targeted else 0.0
+
+    def latest(self):
+        return self.state.latest_result()
+
+    def latest_frame(self):
+        return self.state.latest_frame()
+
+    def error(self):
+        """Message d'erreur du processus enfant, ou None"""
+        try:
+            return self.errors.get_nowait()
+        except queue.Empty:
+            return None
+
+    def counters(self):
+        control = self.state.control
+        counters = {
+            'analysed_frames': int(control[ANALYSED]),
+            'gated_frames': int(control[GATED]),
+            'overruns': int(control[OVERRUNS]),
+        }
+        if self.gate:
+            counters['onsets'] = int(control[ONSETS])
+        return counters
+
+    def gauges(self):
+        """Jauges du processus enfant (plancher de bruit de la porte)"""
+        if not self.gate:
+            return {}
+        return {'noise_floor': round(float(self.state.params[NOISE_FLOOR]), 6)}
+
+    def stop(self, timeout=1.0):
+        """Arrêt coopératif, puis forcé si l'enfant ne répond pas"""
+        if self.state.control is None:
+            return
+        self.state.control[STOP] = 1
+        if self.process.is_alive():
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout)
+        self.errors.close()
+        self.state.close()
+
+    def stop_stream(self):
+        self.stop()
+
+    def close(self):
+        pass
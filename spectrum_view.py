@@ -0,0 +1,154 @@
+"""Panneau spectre + forme d'onde, indépendant de l'analyse.
+
+matplotlib n'est importé qu'à la première ouverture du panneau : tant qu'il
+reste masqué, le démarrage ne paie rien. Les courbes sont créées une fois
+(artistes « animés ») puis mises à jour en place et redessinées par blitting
+sur un fond mis en cache. Les données sont réduites à la largeur en pixels
+(enveloppe min/max pour l'onde, maximum par colonne pour le spectre), et le
+rafraîchissement a sa propre cadence plafonnée, sans lien avec celle de
+l'analyse.
+
+La trame affichée est lue directement dans le tampon de la dernière fenêtre
+analysée (aucune copie par bloc reçu) ; une lecture pendant une écriture ne
+peut produire qu'une image mélangée, sans conséquence pour l'affichage.
+"""
+import numpy as np
+from scipy.fft import rfft, rfftfreq
+
+
+class SpectrumView:
+    """Panneau optionnel, rafraîchi à ``fps`` images/s au plus
+
+    ``source`` renvoie (numéro de trame, trame) : la trame n'est redessinée
+    que si son numéro a changé. ``marker`` renvoie la fréquence à repérer sur
+    le spectre (0 pour aucune).
+    """
+
+    def __init__(self, parent, source, rate, frame_size, marker=None, fps=15,
+                 width=380, height=200, max_freq=1500.0, colors=None):
+        self.parent = parent
+        self.source = source
+        self.marker = marker
+        self.interval = max(1, int(1000 / fps))
+        self.width = width
+        self.height = height
+        self.colors = colors or {}
+        self.visible = False
+        # Boucle de rafraîchissement programmée (une seule à la fois)
+        self.looping = False
+        self.widget = None
+        self.background = None
+        self.drawn_seq = None
+        self.max_freq = max_freq
+        self.configure(rate, frame_size)
+
+    def configure(self, rate, frame_size):
+        """Prépare les tables pour une fréquence et une taille de trame"""
+        self.rate = rate
+        # Tables préparées une fois : fenêtre et colonnes de pixels du spectre
+        self.window = np.hanning(frame_size).astype(np.float32)
+        freqs = rfftfreq(frame_size, 1 / rate)
+        self.n_bins = int(np.searchsorted(freqs, self.max_freq, side='right'))
+        columns = min(self.width, self.n_bins)
+        self.edges = np.linspace(0, self.n_bins, columns + 1).astype(int)
+        self.spectrum_x = freqs[self.edges[:-1]]
+        # Onde : enveloppe min/max, deux points par colonne
+        self.samples_per_column = max(1, frame_size // self.width)
+        columns = frame_size // self.samples_per_column
+        self.wave_x = np.repeat(np.arange(columns) * self.samples_per_column / rate * 1000, 2)
+        self.wave_y = np.zeros(2 * columns, dtype=np.float32)
+        if self.widget is not None:
+            # Figure déjà construite : courbes et axes remplacés, fond redessiné
+            self.wave_line.set_data(self.wave_x, self.wave_y)
+            self.spectrum_line.set_data(self.spectrum_x, np.full(len(self.spectrum_x), -100.0))
+            self.wave_axes.set_xlim(0, self.wave_x[-1])
+            self.spectrum_axes.set_xlim(0, self.spectrum_x[-1])
+            if self.visible:
+                self.canvas.draw_idle()
+
+    def build(self):
+        """Crée la figure (premier affichage seulement)"""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
+        background = self.colors.get('secondary', '#34495E')
+        foreground = self.colors.get('text', '#ECF0F1')
+        dpi = 100
+        self.figure = Figure(figsize=(self.width / dpi, self.height / dpi), dpi=dpi,
+                             facecolor=background)
+        self.wave_axes, self.spectrum_axes = self.figure.subplots(2, 1)
+        for axes in (self.wave_axes, self.spectrum_axes):
+            axes.set_facecolor(background)
+            axes.tick_params(colors=foreground, labelsize=6)
+            for spine in axes.spines.values():
+                spine.set_color(foreground)
+        self.wave_axes.set_xlim(0, self.wave_x[-1])
+        self.wave_axes.set_ylim(-1, 1)
+        self.spectrum_axes.set_xlim(0, self.spectrum_x[-1])
+        self.spectrum_axes.set_ylim(-100, 0)
+        self.figure.subplots_adjust(left=0.1, right=0.98, top=0.97, bottom=0.1, hspace=0.35)
+
+        accent = self.colors.get('accent', '#3498DB')
+        self.wave_line, = self.wave_axes.plot(self.wave_x, self.wave_y, color=accent,
+                                              linewidth=0.8, animated=True)
+        self.spectrum_line, = self.spectrum_axes.plot(self.spectrum_x,
+                                                      np.full(len(self.spectrum_x), -100.0),
+                                                      color=accent, linewidth=0.8, animated=True)
+        self.marker_line = self.spectrum_axes.axvline(0, color=self.colors.get('success', '#2ECC71'),
+                                                      linewidth=0.8, animated=True)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.parent)
+        self.widget = self.canvas.get_tk_widget()
+        # Le fond (axes, graduations) est mis en cache après chaque dessin complet
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.drawn_seq = None
+
+    def show(self, **grid):
+        if self.widget is None:
+            self.build()
+        self.widget.grid(**grid)
+        self.visible = True
+        self.canvas.draw()
+        if not self.looping:
+            self.looping = True
+            self.parent.after(self.interval, self.refresh)
+
+    def hide(self):
+        self.visible = False
+        if self.widget is not None:
+            self.widget.grid_remove()
+
+    def refresh(self):
+        if not self.visible:
+            self.looping = False
+            return
+        seq, frame = self.source()
+        if seq != self.drawn_seq and self.background is not None:
+            self.drawn_seq = seq
+            self.update(frame)
+        self.parent.after(self.interval, self.refresh)
+
+    def update(self, frame):
+        # Onde : min et max de chaque colonne de pixels
+        columns = self.wave_y.reshape(-1, 2)
+        blocks = frame[:len(columns) * self.samples_per_column].reshape(len(columns), -1)
+        blocks.min(axis=1, out=columns[:, 0])
+        blocks.max(axis=1, out=columns[:, 1])
+        self.wave_line.set_ydata(self.wave_y)
+
+        # Spectre en dB, maximum des bins de chaque colonne (les pics restent visibles)
+        magnitude = np.abs(rfft(frame * self.window)[:self.n_bins])
+        peak = np.maximum.reduceat(magnitude, self.edges[:-1])
+        scale = 2 / self.window.sum()
+        self.spectrum_line.set_ydata(20 * np.log10(peak * scale + 1e-9))
+
+        frequency = self.marker() if self.marker else 0
+        self.marker_line.set_visible(frequency > 0)
+        self.marker_line.set_xdata([frequency, frequency])
+
+        self.canvas.restore_region(self.background)
+        for artist in (self.wave_line, self.spectrum_line, self.marker_line):
+            artist.axes.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
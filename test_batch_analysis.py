@@ -0,0 +1,93 @@
+"""Analyse hors ligne : décodage des WAV et pistes de sortie.
+
+    python -m pytest -q test_batch_analysis.py
+"""
+import csv
+import json
+import os
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from batch_analysis import WAVE_FORMAT_IEEE_FLOAT, WavReader, output_path, process_file
+
+RATE = 8000
+# Une demi-seconde de La 440 Hz, avec les extrêmes en tête
+SIGNAL = np.concatenate([[0.0, 0.999, -1.0],
+                         0.5 * np.sin(2 * np.pi * 440 * np.arange(RATE // 2) / RATE)])
+
+
+def write_pcm(path, bits, signal=SIGNAL, channels=1):
+    """WAV PCM 8, 16, 24 ou 32 bits écrit avec le module wave"""
+    if bits == 8:
+        data = np.round(signal * 127 + 128).astype(np.uint8).tobytes()
+    else:
+        samples = np.round(signal * (2 ** (bits - 1) - 1)).astype('<i4')
+        # 24 bits : les trois octets de poids faible de chaque entier 32 bits
+        data = (samples.view(np.uint8).reshape(-1, 4)[:, :bits // 8].tobytes() if bits < 32
+                else samples.tobytes())
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(channels)
+        f.setsampwidth(bits // 8)
+        f.setframerate(RATE)
+        f.writeframes(data)
+
+
+def write_float(path, signal=SIGNAL):
+    """WAV IEEE float 32 bits (le module wave n'écrit que du PCM)"""
+    data = signal.astype('<f4').tobytes()
+    fmt = struct.pack('<HHIIHH', WAVE_FORMAT_IEEE_FLOAT, 1, RATE, RATE * 4, 4, 32)
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<4sI4s', b'RIFF', 4 + 8 + len(fmt) + 8 + len(data), b'WAVE'))
+        f.write(struct.pack('<4sI', b'fmt ', len(fmt)) + fmt)
+        f.write(struct.pack('<4sI', b'data', len(data)) + data)
+
+
+def decode(path, block_size=1000):
+    return np.concatenate([block.copy() for block in WavReader(path).blocks(block_size)])
+
+
+@pytest.mark.parametrize('bits, tolerance', [(8, 1 / 127), (16, 1e-4), (24, 1e-6), (32, 1e-6)])
+def test_pcm_decoding(tmp_path, bits, tolerance):
+    path = tmp_path / f'pcm{bits}.wav'
+    write_pcm(path, bits)
+    reader = WavReader(str(path))
+    assert (reader.rate, reader.channels, reader.frames) == (RATE, 1, len(SIGNAL))
+    assert reader.duration == pytest.approx(len(SIGNAL) / RATE)
+    np.testing.assert_allclose(decode(str(path)), SIGNAL, atol=tolerance)
+
+
+def test_float_decoding(tmp_path):
+    path = tmp_path / 'float.wav'
+    write_float(path)
+    np.testing.assert_allclose(decode(str(path)), SIGNAL, atol=1e-7)
+
+
+def test_stereo_is_mixed_to_mono(tmp_path):
+    path = tmp_path / 'stereo.wav'
+    stereo = np.stack([SIGNAL, np.zeros_like(SIGNAL)], axis=1).ravel()
+    write_pcm(path, 24, stereo, channels=2)
+    np.testing.assert_allclose(decode(str(path)), SIGNAL / 2, atol=1e-6)
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl'])
+def test_process_file_writes_track(tmp_path, fmt):
+    path = tmp_path / 'take.wav'
+    write_pcm(path, 16)
+    _, duration, rows = process_file(str(path), None, fmt, 'fft', 2048, 512)
+    assert duration == pytest.approx(len(SIGNAL) / RATE)
+    assert rows > 0
+    with open(output_path(str(path), None, fmt), newline='') as f:
+        track = list(csv.DictReader(f)) if fmt == 'csv' else [json.loads(line) for line in f]
+    assert len(track) == rows
+    assert all((row['note'], str(row['octave'])) == ('A', '4') for row in track)
+
+
+def test_unreadable_input_leaves_no_track(tmp_path):
+    path = tmp_path / 'broken.wav'
+    path.write_bytes(b'ceci n est pas un WAV')
+    with pytest.raises(ValueError):
+        process_file(str(path), None, 'csv', 'fft', 2048, 512)
+    assert not os.path.exists(output_path(str(path), None, 'csv'))
@@ -0,0 +1,67 @@
+"""Mode embarqué : pas de mémoire retenue ni d'allocation proportionnelle à la trame.
+
+    python -m pytest -q test_embedded.py
+"""
+import tracemalloc
+
+import pytest
+
+import benchmark
+from pitch_detection import DETECTORS
+from tracking import PitchTracker
+
+# Un signal sur trois du banc d'essai, mis bout à bout (environ 75 s)
+SIGNALS = list(benchmark.test_signals())[::3]
+WINDOW = 8192
+HOP = 2048
+# Allocations tolérées pendant la trame la plus coûteuse : surcoût fixe des
+# appels numpy/scipy, bien en dessous d'une trame analysée (2048 float64)
+MAX_FRAME_BYTES = 5 * 1024
+
+
+@pytest.fixture(scope='module', params=sorted(DETECTORS))
+def detector_name(request):
+    return request.param
+
+
+def test_low_memory_retains_nothing(detector_name):
+    result = benchmark.memory_check(detector_name, SIGNALS, WINDOW, HOP)
+    assert result['frames'] > 500
+    assert abs(result['growth_per_frame']) < 1.0
+    assert result['gc_collections'] == 0
+
+
+def test_low_memory_frame_allocations_bounded(detector_name):
+    result = benchmark.memory_check(detector_name, SIGNALS, WINDOW, HOP)
+    assert result['max_frame_bytes'] < MAX_FRAME_BYTES
+
+
+def test_standard_mode_exceeds_frame_bound(detector_name):
+    # Le seuil distingue bien les deux modes
+    result = benchmark.memory_check(detector_name, SIGNALS, WINDOW, HOP, low_memory=False)
+    assert result['max_frame_bytes'] > MAX_FRAME_BYTES
+
+
+def test_low_memory_tracking_path(detector_name):
+    # Chemin de l'accordeur : porte d'énergie, suivi et bancs étroits
+    result = benchmark.memory_check(detector_name, SIGNALS, WINDOW, HOP, track=True)
+    assert abs(result['growth_per_frame']) < 1.0
+    assert result['gc_collections'] == 0
+    assert result['max_frame_bytes'] < MAX_FRAME_BYTES
+
+
+def test_tracker_banks_are_recentred_in_place():
+    tracker = PitchTracker(11025, 2048, None, low_memory=True)
+    banks = {id(bank) for bank in tracker.banks.values()}
+    centers = [440.0 * 2 ** (semitone / 12) for semitone in range(-36, -12)]
+    worst = 0
+    tracemalloc.start()
+    for center in centers:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        narrow = tracker.bank(center)
+        worst = max(worst, tracemalloc.get_traced_memory()[1] - base)
+        assert narrow.target == pytest.approx(center)
+    tracemalloc.stop()
+    assert {id(bank) for bank in tracker.banks.values()} == banks
+    assert worst < MAX_FRAME_BYTES
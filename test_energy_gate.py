@@ -0,0 +1,63 @@
+"""Porte d'énergie : attaques, extinction et changement du bruit de fond.
+
+    python -m pytest -q test_energy_gate.py
+"""
+import numpy as np
+import pytest
+
+import benchmark
+from notes import note_frequency
+from pitch_detection import EnergyGate
+
+RATE = 48000
+BLOCK = 512
+
+
+def noise(seconds, level, seed=0):
+    return np.random.default_rng(seed).normal(0, level, int(RATE * seconds))
+
+
+def run_gate(signal, block_size=BLOCK):
+    """(porte, instants de début de bloc, états de la porte)"""
+    gate = EnergyGate(RATE)
+    signal = signal.astype(np.float32)
+    starts = range(0, len(signal) - block_size + 1, block_size)
+    states = np.array([gate.update(signal[start:start + block_size]) for start in starts])
+    return gate, np.array(starts) / RATE, states
+
+
+def test_single_pluck_opens_once():
+    note = benchmark.pluck(110.0, rate=RATE, duration=4.0)
+    signal = np.concatenate([noise(1.0, 1e-3), note + noise(4.0, 1e-3, seed=1)])
+    gate, times, states = run_gate(signal)
+    assert gate.onsets == 1
+    assert states[(times > 1.05) & (times < 2.0)].all()
+    assert not states[times > 4.5].any()
+
+
+def test_noise_step_closes_gate():
+    # Bruit de fond multiplié par 6 (ventilateur, ronflement d'ampli)
+    signal = np.concatenate([noise(2.0, 1e-3), noise(20.0, 6e-3, seed=1)])
+    gate, times, states = run_gate(signal)
+    assert states[(times > 2.0) & (times < 2.5)].any()
+    assert not states[times > 8.0].any()
+    assert gate.noise_floor > 3e-3
+
+
+def test_pluck_after_noise_step_reopens():
+    note = benchmark.pluck(110.0, rate=RATE, duration=3.0)
+    signal = np.concatenate([noise(2.0, 1e-3), noise(10.0, 6e-3, seed=1),
+                             note + noise(3.0, 6e-3, seed=2)])
+    gate, times, states = run_gate(signal)
+    assert not states[(times > 8.0) & (times < 12.0)].any()
+    assert states[(times > 12.05) & (times < 12.5)].all()
+
+
+@pytest.mark.parametrize('block_size', [128, 256, 512, 2048])
+@pytest.mark.parametrize('string', ['E2', 'A2', 'D3', 'G3', 'B3', 'E4'])
+def test_one_onset_per_pluck_whatever_the_block_size(string, block_size):
+    # Les blocs de 128 échantillons sont plus courts qu'une période de E2
+    note = benchmark.pluck(note_frequency(string), rate=RATE, duration=3.0)
+    signal = np.concatenate([noise(0.5, 1e-3), note + noise(3.0, 1e-3, seed=1)])
+    gate, _, _ = run_gate(signal, block_size)
+    assert gate.onsets == 1
@@ -0,0 +1,49 @@
+"""Mode accord : partiels des cordes graves et cordes fantômes.
+
+    python -m pytest -q test_polyphonic.py
+"""
+import numpy as np
+import pytest
+
+import benchmark
+from decimation import ANALYSIS_RATE
+from notes import STRINGS, note_frequency
+from pitch_detection import PolyphonicDetector
+
+FRAME = 2048
+TARGETS = [note_frequency(string) for string, _ in STRINGS]
+
+
+def frame_of(signal):
+    return signal[2000:2000 + FRAME].astype(np.float32)
+
+
+def cents(estimate, target):
+    return 1200 * np.log2(estimate.frequency / target)
+
+
+@pytest.fixture(scope='module', params=[False, True], ids=['standard', 'low_memory'])
+def detector(request):
+    return PolyphonicDetector(ANALYSIS_RATE, FRAME, TARGETS, low_memory=request.param)
+
+
+@pytest.mark.parametrize('string', [0, 1])
+def test_lone_low_string_has_no_ghosts(detector, string):
+    # 3 × A2 ≈ E4, 3 × E2 ≈ B3 : seule la corde jouée est retenue
+    note = benchmark.pluck(TARGETS[string], rate=ANALYSIS_RATE)
+    estimates = detector.detect(frame_of(note))
+    assert [bool(estimate.frequency) for estimate in estimates] == [
+        index == string for index in range(len(TARGETS))]
+    assert abs(cents(estimates[string], TARGETS[string])) < 1.0
+
+
+def test_strum_keeps_strings_sharing_partials(detector):
+    # B3 désaccordé de -5 cents sous le 3e partiel de E2
+    detunes = [0, 0, 0, 0, -5, 0]
+    strum = sum(benchmark.pluck(target * 2 ** (detune / 1200), rate=ANALYSIS_RATE,
+                                rng=np.random.default_rng(index))
+                for index, (target, detune) in enumerate(zip(TARGETS, detunes)))
+    estimates = detector.detect(frame_of(strum))
+    for estimate, target, detune in zip(estimates, TARGETS, detunes):
+        assert estimate.frequency
+        assert cents(estimate, target) == pytest.approx(detune, abs=1.5)
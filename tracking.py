@@ -0,0 +1,138 @@
+"""Suivi de hauteur incrémental : recherche étroite autour de la note suivie.
+
+Une recherche complète (détecteur général) n'a lieu qu'à l'attaque d'une note
+ou quand la note suivie est perdue. Entre les deux, chaque trame n'est
+analysée que sur une bande étroite autour de la note verrouillée, avec un banc
+``TargetedDetector`` centré sur le demi-ton le plus proche (les bancs récents
+sont gardés en cache : une corde repincée ne les reconstruit pas).
+
+En mode low_memory, les ``cache_size`` bancs sont construits d'avance (sur
+les cordes à vide) et le moins récent est recentré en place : verrouiller un
+nouveau demi-ton n'alloue plus de tables.
+
+Les sauts d'octave ou de douzième proposés par la recherche complète en cours
+de note sont ignorés pendant quelques trames, et la sortie est lissée par une
+médiane glissante des dernières estimations.
+"""
+import math
+from collections import OrderedDict, deque
+
+from instrumentation import NULL_STATS
+from notes import A4_FREQ, STRINGS, note_frequency
+from pitch_detection import PitchEstimate, TargetedDetector
+
+
+def harmonic_jump(frequency, reference, tolerance_cents=50):
+    """Vrai si frequency est une octave, une douzième (ou leur inverse) de reference"""
+    cents = 1200 * math.log2(frequency / reference)
+    return any(abs(abs(cents) - 1200 * math.log2(k)) < tolerance_cents for k in (2, 3))
+
+
+class PitchTracker:
+    """Suivi de la note en cours avec recherche étroite et lissage médian
+
+    ``detector`` fait la recherche complète (et peut être remplacé à chaud).
+    ``update`` renvoie un PitchEstimate lissé, de fréquence nulle quand la
+    trame n'apporte rien de nouveau (silence ou saut harmonique ignoré).
+    """
+    # Instrumentation (voir instrumentation.Stats), désactivée par défaut
+    stats = NULL_STATS
+
+    def __init__(self, rate, frame_size, detector, history=5, span_cents=100, step_cents=10,
+                 harmonics=2, jump_frames=3, cache_size=6, a4_freq=A4_FREQ, low_memory=False):
+        self.rate = rate
+        self.frame_size = frame_size
+        self.detector = detector
+        self.span_cents = span_cents
+        self.step_cents = step_cents
+        self.harmonics = harmonics
+        self.jump_frames = jump_frames
+        self.cache_size = cache_size
+        self.a4_freq = a4_freq
+        self.low_memory = low_memory
+        self.banks = OrderedDict()
+        if low_memory:
+            strings = [note_frequency(name, a4_freq) for name, _ in STRINGS]
+            for frequency in (strings * cache_size)[:cache_size]:
+                self.banks[self.semitone(frequency)] = self.new_bank(frequency)
+        self.history = deque(maxlen=history)
+        self.narrow = None
+        self.locked = None
+        self.misses = 0
+        self.full_searches = 0
+        self.narrow_searches = 0
+
+    def reset(self):
+        """Oublie la note suivie (la prochaine trame fera une recherche complète)"""
+        self.narrow = None
+        self.locked = None
+        self.misses = 0
+        self.history.clear()
+
+    def semitone(self, frequency):
+        return round(12 * math.log2(frequency / self.a4_freq))
+
+    def new_bank(self, center):
+        return TargetedDetector(self.rate, self.frame_size, center,
+                                span_cents=self.span_cents, step_cents=self.step_cents,
+                                harmonics=self.harmonics, low_memory=self.low_memory)
+
+    def bank(self, frequency):
+        """Détecteur étroit centré sur le demi-ton le plus proche (cache LRU)"""
+        semitone = self.semitone(frequency)
+        narrow = self.banks.pop(semitone, None)
+        if narrow is None:
+            center = self.a4_freq * 2 ** (semitone / 12)
+            if self.low_memory:
+                # Le banc le moins récent est recentré en place
+                _, narrow = self.banks.popitem(last=False)
+                narrow.set_target(center)
+            else:
+                narrow = self.new_bank(center)
+                if len(self.banks) >= self.cache_size:
+                    self.banks.popitem(last=False)
+        # Instrumentation affectée après la construction du suivi
+        narrow.stats = self.stats
+        self.banks[semitone] = narrow
+        return narrow
+
+    def update(self, frame, onset=False):
+        """Analyse une trame ; onset signale une nouvelle attaque (porte d'énergie)"""
+        if onset or self.narrow is None:
+            return self.full_search(frame, onset=True)
+        estimate = self.narrow.detect(frame)
+        self.narrow_searches += 1
+        self.stats.count('tracker_narrow')
+        if estimate.frequency > 0:
+            self.misses = 0
+            return self.accept(estimate)
+        # Note perdue (hors de la bande ou trop faible) : recherche complète
+        return self.full_search(frame, onset=False)
+
+    def full_search(self, frame, onset):
+        estimate = self.detector.detect(frame)
+        self.full_searches += 1
+        self.stats.count('tracker_full')
+        if estimate.frequency <= 0:
+            self.misses += 1
+            if self.misses > self.jump_frames:
+                self.reset()
+            return estimate
+        if (not onset and self.locked is not None and self.misses < self.jump_frames
+                and harmonic_jump(estimate.frequency, self.locked)):
+            # Saut d'octave en cours de note : probablement une harmonique
+            self.misses += 1
+            self.stats.count('tracker_held')
+            return PitchEstimate(0.0, 0.0, estimate.level)
+        self.narrow = self.bank(estimate.frequency)
+        self.history.clear()
+        self.misses = 0
+        return self.accept(estimate)
+
+    def accept(self, estimate):
+        self.history.append(estimate.frequency)
+        # Médiane en Python pur : bien plus rapide que np.median sur quelques valeurs
+        ordered = sorted(self.history)
+        middle = len(ordered) // 2
+        self.locked = ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+        return PitchEstimate(self.locked, estimate.confidence, estimate.level)